@@ -0,0 +1,8 @@
+-- Canonical location keys for citizen reports (see gazetteer.py)
+-- Run this in Supabase SQL Editor, then run backfill_location_keys.py
+alter table public.citizen_reports
+    add column if not exists location_key text;
+
+-- Equality lookups by area, newest first, instead of ilike '%...%' sequential scans
+create index if not exists citizen_reports_location_key_idx
+    on public.citizen_reports(location_key, created_at desc);
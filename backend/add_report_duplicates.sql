@@ -0,0 +1,8 @@
+-- Link forwarded copies of the same photo to the original report
+-- Run this in Supabase SQL Editor
+alter table public.reports
+    add column if not exists duplicate_of uuid references public.reports(id);
+
+-- Brain and dashboards only count originals
+create index if not exists reports_duplicate_of_idx on public.reports(duplicate_of)
+    where duplicate_of is not null;
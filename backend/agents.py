@@ -1,6 +1,11 @@
 import os
+import asyncio
+import time
+from collections import OrderedDict
 import google.generativeai as genai
 from tools import get_weather_data, calculate_risk_score, create_dispatch_ticket, get_citizen_reports
+from cache import AsyncTTLCache
+from llm_cache import cached_llm_call_async
 from dotenv import load_dotenv
 import json
 
@@ -17,51 +22,196 @@ from google.adk.runners import InMemoryRunner
 from google.adk.tools import google_search
 from google.genai import types
 
-# Define helper for ADK Runner
-async def run_adk_agent(agent, prompt):
-    runner = InMemoryRunner(agent=agent)
-    response = await runner.run_debug(prompt)
-    # Handle list return type (history of turns)
-    if isinstance(response, list):
-        last_event = response[-1]
-        if last_event.content and last_event.content.parts:
-            return last_event.content.parts[0].text
-        return "No text content found in response."
-    return response.text
+# ADK Runner Pool Config
+# Each pooled runner holds at most one live LLM session, so the pool size caps
+# concurrent agent runs; bursts beyond it queue for a free runner.
+ADK_POOL_SIZE = int(os.environ.get("ADK_POOL_SIZE", 4))
+ADK_USER_ID = "sentinel"
 
-async def run_web_scout_agent(location: str):
+class RunnerPool:
     """
-    Uses Google ADK Agent with Google Search to find real-time health trends.
+    Bounded pool of reusable InMemoryRunners for one agent definition.
+    Runners are created lazily up to `size` and handed out FIFO.
     """
-    # Define the ADK Agent
-    web_scout = Agent(
-        name="web_scout",
-        model=Gemini(model="gemini-2.5-flash"),
-        instruction=f"""
-        You are a Medical Intelligence Scout.
-        Search for recent news, tweets, or reports about disease outbreaks or health symptoms in {location} from the last 30 days.
-        Focus on: Dengue, Malaria, Leptospirosis, Fever, Flu.
-        
-        Return a list of 3 short, specific summaries of what you found.
-        Format:
-        - [Source] Summary
+
+    def __init__(self, agent, size: int = ADK_POOL_SIZE):
+        self.agent = agent
+        self.size = size
+        self._idle = asyncio.Queue()
+        self._created = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.stats = {"runs": 0, "errors": 0, "queued": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+    async def acquire(self):
+        started = time.monotonic()
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            runner = InMemoryRunner(agent=self.agent)
+        else:
+            self.waiting += 1
+            self.stats["queued"] += 1
+            try:
+                runner = await self._idle.get()
+            finally:
+                self.waiting -= 1
         
-        If nothing significant is found, return "No significant recent reports found."
-        """,
-        tools=[google_search]
-    )
+        waited = time.monotonic() - started
+        self.stats["wait_seconds_total"] += waited
+        self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+        self.stats["runs"] += 1
+        self.in_use += 1
+        return runner
+
+    def release(self, runner):
+        self.in_use -= 1
+        self._idle.put_nowait(runner)
+
+    def snapshot(self) -> dict:
+        runs = self.stats["runs"]
+        return {
+            **self.stats,
+            "agent": self.agent.name,
+            "size": self.size,
+            "created": self._created,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "occupancy": round(self.in_use / self.size, 2),
+            "wait_seconds_avg": round(self.stats["wait_seconds_total"] / runs, 4) if runs else 0.0,
+        }
+
+# Define helper for ADK Runner
+async def run_adk_agent(pool: RunnerPool, prompt: str, state: dict = None) -> str:
+    """
+    Runs one prompt on a pooled runner inside a fresh session.
+    `state` fills {placeholders} in the agent instruction. The session is deleted
+    afterwards so reused runners don't accumulate conversation history.
+    """
+    runner = await pool.acquire()
+    try:
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=ADK_USER_ID, state=state or {}
+        )
+        try:
+            message = types.Content(role="user", parts=[types.Part(text=prompt)])
+            text = None
+            async for event in runner.run_async(user_id=ADK_USER_ID, session_id=session.id, new_message=message):
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = "".join(part.text or "" for part in event.content.parts)
+            return text or "No text content found in response."
+        finally:
+            await runner.session_service.delete_session(
+                app_name=runner.app_name, user_id=ADK_USER_ID, session_id=session.id
+            )
+    except Exception:
+        pool.stats["errors"] += 1
+        raise
+    finally:
+        pool.release(runner)
+
+# Define the ADK Agent once; {location} is filled from session state on every run
+web_scout = Agent(
+    name="web_scout",
+    model=Gemini(model="gemini-2.5-flash"),
+    instruction="""
+    You are a Medical Intelligence Scout.
+    Search for recent news, tweets, or reports about disease outbreaks or health symptoms in {location} from the last 30 days.
+    Focus on: Dengue, Malaria, Leptospirosis, Fever, Flu.
+    
+    Return a list of 3 short, specific summaries of what you found.
+    Format:
+    - [Source] Summary
     
+    If nothing significant is found, return "No significant recent reports found."
+    """,
+    tools=[google_search]
+)
+
+web_scout_pool = RunnerPool(web_scout)
+
+# Web Scout Cache Config
+# News for a city barely moves minute to minute, so results are reused for SCOUT_CACHE_TTL.
+# Locations requested at least SCOUT_HOT_MIN_REQUESTS times, the last within
+# SCOUT_HOT_WINDOW, are re-scouted in the background; one-off requests are not, since
+# every background run is a paid agent call. At most SCOUT_MAX_TRACKED locations are
+# tracked, least recently requested dropped first.
+SCOUT_CACHE_TTL = float(os.environ.get("SCOUT_CACHE_TTL", 900))
+SCOUT_REFRESH_INTERVAL = float(os.environ.get("SCOUT_REFRESH_INTERVAL", 60))
+SCOUT_HOT_WINDOW = float(os.environ.get("SCOUT_HOT_WINDOW", 3600))
+SCOUT_HOT_MIN_REQUESTS = int(os.environ.get("SCOUT_HOT_MIN_REQUESTS", 3))
+SCOUT_MAX_TRACKED = int(os.environ.get("SCOUT_MAX_TRACKED", 256))
+SCOUT_WARM_LOCATIONS = [l.strip() for l in os.environ.get("SCOUT_WARM_LOCATIONS", "Mumbai").split(",") if l.strip()]
+
+# The persistent LLM cache only has to survive restarts; it expires before the in-memory
+# refresh point so background re-scouts always reach the agent instead of the disk copy.
+SCOUT_LLM_CACHE_TTL = max(SCOUT_CACHE_TTL - 3 * SCOUT_REFRESH_INTERVAL, 0)
+
+_scout_requests = OrderedDict()  # key -> [monotonic time of the last user request, request count], LRU first
+
+def _scout_key(location: str) -> str:
+    return " ".join(location.split()).lower()
+
+async def run_web_scout_agent(location: str):
+    """
+    Returns real-time health trends for a location from the web-scout cache.
+    Identical concurrent requests share one agent run, and stale results are
+    served while the agent re-runs in the background.
+    """
+    key = _scout_key(location)
+    entry = _scout_requests.pop(key, None) or [0.0, 0]
+    entry[0] = time.monotonic()
+    entry[1] += 1
+    _scout_requests[key] = entry
+    while len(_scout_requests) > SCOUT_MAX_TRACKED:
+        _scout_requests.popitem(last=False)
     try:
-        # Run the agent using ADK Runner
-        # Note: In a real app, we might reuse the runner/session
-        result_text = await run_adk_agent(web_scout, f"Find health trends in {location}")
-        
-        # Parse the text response into our list format
-        return [{"description": line.strip()} for line in result_text.split('\n') if line.strip().startswith('-')]
+        return await scout_cache.get(key)
     except Exception as e:
         print(f"⚠️ ADK Web Scout Error: {e}")
         return [{"description": "Error running ADK Web Scout."}]
 
+async def keep_web_scout_warm(interval: float = SCOUT_REFRESH_INTERVAL):
+    """
+    Background job: re-scouts SCOUT_WARM_LOCATIONS and hot locations before their
+    cache entry expires, so user requests for them never wait on the agent.
+    Locations nobody has asked for within SCOUT_HOT_WINDOW are dropped from the cache.
+    """
+    warm_keys = {_scout_key(l) for l in SCOUT_WARM_LOCATIONS}
+    while True:
+        now = time.monotonic()
+        for key, (last_requested, _) in list(_scout_requests.items()):
+            if now - last_requested > SCOUT_HOT_WINDOW:
+                del _scout_requests[key]
+                if key not in warm_keys:
+                    scout_cache.invalidate(key)
+        
+        hot_keys = {key for key, (_, requests) in _scout_requests.items() if requests >= SCOUT_HOT_MIN_REQUESTS}
+        for key in warm_keys | hot_keys:
+            age = scout_cache.age(key)
+            # Refresh one interval ahead of expiry (or right away if never scouted)
+            if age is None or age > SCOUT_CACHE_TTL - 2 * interval:
+                scout_cache.refresh(key)
+        
+        await asyncio.sleep(interval)
+
+async def _scout_web(location: str):
+    """
+    Uses Google ADK Agent with Google Search to find real-time health trends.
+    Errors propagate so that failed runs are never cached.
+    """
+    prompt = f"Find health trends in {location}"
+    result_text = await cached_llm_call_async(
+        "web_scout", "gemini-2.5-flash", prompt,
+        lambda: run_adk_agent(web_scout_pool, prompt, {"location": location}),
+        ttl=SCOUT_LLM_CACHE_TTL,
+        inputs={"instruction": web_scout.instruction, "location": location}
+    )
+    
+    # Parse the text response into our list format
+    return [{"description": line.strip()} for line in result_text.split('\n') if line.strip().startswith('-')]
+
+scout_cache = AsyncTTLCache(_scout_web, ttl=SCOUT_CACHE_TTL, name="web_scout_cache")
+
 async def run_sentinel_agent(location: str):
     # ... (existing code)
     """
@@ -76,7 +226,7 @@ async def run_sentinel_agent(location: str):
     
     print("👀 Perception: Scanning Weather & Citizen Reports...")
     weather_data = await get_weather_data(lat, lon)
-    reports = get_citizen_reports(location)
+    reports = await get_citizen_reports(location)
     report_count = len(reports) if reports else 0
     
     print(f"   - Rain: {weather_data['current']['rain']}mm")
@@ -95,7 +245,7 @@ async def run_sentinel_agent(location: str):
         print("✋ Action: PAUSING for Human Approval.")
         
         # Create Ticket
-        ticket = create_dispatch_ticket(location, risk_score, reasoning)
+        ticket = await create_dispatch_ticket(location, risk_score, reasoning)
         return {
             "status": "PAUSED",
             "message": "High risk detected. Dispatch ticket created. Waiting for official approval.",
@@ -0,0 +1,63 @@
+"""
+One-off backfill of citizen_reports.location_key for rows created before the column existed.
+Apply add_location_keys.sql first. Safe to re-run: only rows without a key are touched.
+
+    python backfill_location_keys.py            # write keys
+    python backfill_location_keys.py --dry-run  # only report what would change
+"""
+import os
+import sys
+from collections import defaultdict
+from dotenv import load_dotenv
+from supabase import create_client
+from gazetteer import location_key
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_KEY')
+PAGE_SIZE = 1000
+
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+dry_run = "--dry-run" in sys.argv
+
+print(f"🗺️ Backfilling citizen_reports.location_key{' (dry run)' if dry_run else ''}...")
+
+scanned = 0
+updated = 0
+unmatched = defaultdict(int)
+last_id = None
+
+while True:
+    # Keyset pagination on id, so each page is an index range scan
+    query = supabase.table('citizen_reports').select('id, location')\
+        .is_('location_key', 'null').order('id').limit(PAGE_SIZE)
+    if last_id is not None:
+        query = query.gt('id', last_id)
+    rows = query.execute().data
+    if not rows:
+        break
+    last_id = rows[-1]['id']
+    scanned += len(rows)
+
+    # One UPDATE per distinct key in the page
+    ids_by_key = defaultdict(list)
+    for row in rows:
+        key = location_key(row['location'])
+        if key:
+            ids_by_key[key].append(row['id'])
+        else:
+            unmatched[row['location']] += 1
+
+    for key, ids in ids_by_key.items():
+        if not dry_run:
+            supabase.table('citizen_reports').update({'location_key': key}).in_('id', ids).execute()
+        updated += len(ids)
+    print(f"   ... {scanned} scanned, {updated} keyed")
+
+print(f"\n✅ Done: {updated}/{scanned} rows keyed.")
+if unmatched:
+    print(f"⚠️ {sum(unmatched.values())} rows matched no area. Most common locations:")
+    for location, count in sorted(unmatched.items(), key=lambda x: x[1], reverse=True)[:10]:
+        print(f"   {count:6d}  {location}")
+    print("💡 Add aliases for these to AREAS in gazetteer.py and re-run.")
@@ -0,0 +1,103 @@
+"""
+Benchmark: the previous hand-coded predict_disease_risk vs the compiled rule engine.
+Also checks that both give identical predictions for every ward.
+
+    python benchmark_disease_rules.py
+"""
+import random
+import time
+import numpy as np
+from disease_rules import disease_rules
+
+SIZES = [10_000, 100_000]
+VOCABULARY = ["fever", "joint pain", "chills", "cough", "headache", "rash", "nausea"]  # analyze_symptoms terms
+
+
+# Reference: predict_disease_risk before it moved to disease_rules.py
+def legacy_predict_disease_risk(weather_data: dict, symptoms: list) -> list:
+    """
+    Predicts potential diseases based on weather patterns and reported symptoms.
+    """
+    risks = []
+    current = weather_data.get("current", {})
+    rain = current.get("rain", 0.0)
+    humidity = current.get("relative_humidity_2m", 0)
+    
+    # Symptom Keywords
+    symptom_text = " ".join(symptoms).lower()
+    
+    # 1. Dengue Risk
+    # High humidity + Rain + High Fever/Joint Pain
+    dengue_score = 0
+    if humidity > 70: dengue_score += 1
+    if rain > 5: dengue_score += 1
+    if "fever" in symptom_text: dengue_score += 1
+    if "joint" in symptom_text or "bone" in symptom_text: dengue_score += 2
+    
+    if dengue_score >= 3:
+        risks.append({"disease": "Dengue", "probability": "High", "vector": "Aedes Mosquito"})
+    elif dengue_score >= 1:
+        risks.append({"disease": "Dengue", "probability": "Moderate", "vector": "Aedes Mosquito"})
+
+    # 2. Malaria Risk
+    # Stagnant water (Rain) + Chills/Sweating
+    malaria_score = 0
+    if rain > 10: malaria_score += 2
+    if "chills" in symptom_text: malaria_score += 2
+    if "sweat" in symptom_text: malaria_score += 1
+    
+    if malaria_score >= 3:
+        risks.append({"disease": "Malaria", "probability": "High", "vector": "Anopheles Mosquito"})
+        
+    # 3. Leptospirosis Risk
+    # Heavy Rain (Flooding) + Muscle Pain
+    lepto_score = 0
+    if rain > 20: lepto_score += 3
+    if "muscle" in symptom_text or "calf" in symptom_text: lepto_score += 2
+    
+    if lepto_score >= 3:
+        risks.append({"disease": "Leptospirosis", "probability": "High", "vector": "Contaminated Water"})
+
+    return risks
+
+
+def make_wards(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    weather = [
+        {"current": {"rain": rng.choice([0.0, 3.0, 5.0, 8.0, 10.0, 15.0, 20.0, 35.0]),
+                     "relative_humidity_2m": rng.randint(40, 100)}}
+        for _ in range(n)
+    ]
+    symptoms = [rng.sample(VOCABULARY + ["sweating", "calf pain", "bone ache"], rng.randint(0, 3)) for _ in range(n)]
+    return weather, symptoms
+
+
+def best_of(runs: int, func):
+    """
+    Returns (best seconds, last result) over a few runs to smooth out noise.
+    """
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+for n in SIZES:
+    weather, symptoms = make_wards(n)
+
+    legacy_seconds, legacy = best_of(3, lambda: [legacy_predict_disease_risk(w, s) for w, s in zip(weather, symptoms)])
+    compiled_seconds, compiled = best_of(3, lambda: disease_rules.predict_many(weather, symptoms))
+
+    # Engine alone on column arrays, i.e. without converting dicts in and out
+    features = {f: np.array([w["current"].get(f, 0) for w in weather], dtype=np.float64) for f in disease_rules.fields}
+    hits = disease_rules.symptom_matrix(symptoms)
+    core_seconds, _ = best_of(3, lambda: disease_rules.levels(disease_rules.score(features, hits)))
+
+    print(f"📊 {n:>9,} wards x {len(disease_rules.diseases)} diseases")
+    print(f"   legacy loop      : {legacy_seconds * 1000:8.1f} ms ({n / legacy_seconds:>12,.0f} wards/s)")
+    print(f"   compiled (dicts) : {compiled_seconds * 1000:8.1f} ms ({n / compiled_seconds:>12,.0f} wards/s)")
+    print(f"   compiled (arrays): {core_seconds * 1000:8.1f} ms ({n / core_seconds:>12,.0f} wards/s)")
+    print(f"   identical        : {'✅' if legacy == compiled else '❌'}")
@@ -0,0 +1,55 @@
+-- Benchmark: ilike '%location%' vs indexed location_key lookup at 1M rows
+-- Run in Supabase SQL Editor (or psql). Uses a scratch table, nothing else is touched.
+
+drop table if exists bench_citizen_reports;
+create table bench_citizen_reports (
+    id bigint generated always as identity primary key,
+    location text not null,
+    location_key text,
+    verified boolean default false,
+    created_at timestamp with time zone not null
+);
+
+-- 1M reports spread over 37 areas with realistic free-text locations
+with areas(key, name) as (
+    values ('andheri-east', 'Andheri East'), ('andheri-west', 'Andheri West'), ('andheri', 'Andheri'),
+           ('bandra-east', 'Bandra East'), ('bandra-west', 'Bandra West'), ('bandra', 'Bandra'),
+           ('borivali-east', 'Borivali East'), ('borivali-west', 'Borivali West'), ('borivali', 'Borivali'),
+           ('goregaon-east', 'Goregaon East'), ('goregaon-west', 'Goregaon West'), ('goregaon', 'Goregaon'),
+           ('malad-east', 'Malad East'), ('malad-west', 'Malad West'), ('malad', 'Malad'),
+           ('santacruz-east', 'Santacruz East'), ('santacruz-west', 'Santacruz West'), ('santacruz', 'Santacruz'),
+           ('chembur', 'Chembur'), ('colaba', 'Colaba'), ('dadar', 'Dadar'), ('dahisar', 'Dahisar'),
+           ('dharavi', 'Dharavi'), ('fort', 'Fort'), ('ghatkopar', 'Ghatkopar'), ('juhu', 'Juhu'),
+           ('kandivali', 'Kandivali'), ('kurla', 'Kurla'), ('malabar-hill', 'Malabar Hill'),
+           ('marine-lines', 'Marine Lines'), ('mulund', 'Mulund'), ('powai', 'Powai'), ('sion', 'Sion'),
+           ('versova', 'Versova'), ('vikhroli', 'Vikhroli'), ('vile-parle', 'Vile Parle'), ('worli', 'Worli')
+),
+numbered as (
+    select key, name, row_number() over (order by key) - 1 as n, count(*) over () as total from areas
+)
+insert into bench_citizen_reports (location, location_key, verified, created_at)
+select 'Near ' || a.name || ' station, lane ' || (g % 500),
+       a.key,
+       g % 4 = 0,
+       now() - (g % 43200) * interval '1 minute'
+from generate_series(1, 1000000) g
+join numbered a on a.n = g % a.total;
+
+create index bench_location_key_idx on bench_citizen_reports(location_key, created_at desc);
+analyze bench_citizen_reports;
+
+-- Before: leading-wildcard pattern, sequential scan of every row
+explain (analyze, buffers)
+select * from bench_citizen_reports where location ilike '%Andheri%';
+
+-- After: what get_citizen_reports('Andheri') sends (area + sub-areas), index scan
+explain (analyze, buffers)
+select * from bench_citizen_reports where location_key in ('andheri', 'andheri-east', 'andheri-west');
+
+-- BMC view: all nine wards in one query
+explain (analyze, buffers)
+select location, verified, location_key from bench_citizen_reports
+where location_key in ('colaba', 'malabar-hill', 'dadar', 'bandra-west', 'bandra', 'andheri-east',
+                       'andheri-west', 'andheri', 'kurla', 'powai', 'sion');
+
+drop table bench_citizen_reports;
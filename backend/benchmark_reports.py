@@ -0,0 +1,135 @@
+"""
+Benchmark: memory and per-scan aggregation time for the brain's sliding window
+(reports bucketed by ward, then counted, severity-averaged and type-counted per
+ward as analyze_wards_batch does) holding 100k+ reports as select("*") dicts vs
+projected __slots__ Reports, and the peak when Reports are built from PAGE_SIZE
+pages (as db.iter_pages delivers them) instead of one response.
+Also checks both give identical per-ward counts, severities and type counts.
+
+    python benchmark_reports.py
+"""
+import gc
+import json
+import random
+import struct
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from db import PAGE_SIZE
+from reports import BRAIN_COLUMNS, Report
+
+SIZES = [100_000, 300_000]
+WARDS = [str(uuid.UUID(int=random.Random(i).getrandbits(128))) for i in range(24)]
+TYPES = ["Garbage", "Stagnant Water", "Sewage", "Mosquito Breeding", "Dead Animal"]
+
+
+def ewkb_point(lat: float, lon: float) -> str:
+    # PostgREST's default geometry encoding: little-endian point with SRID 4326
+    return struct.pack("<BIIdd", 1, 0x20000001, 4326, lon, lat).hex().upper()
+
+
+def make_rows(n: int, seed: int = 42) -> list:
+    """
+    Full reports rows as select("*") returns them.
+    """
+    rng = random.Random(seed)
+    start = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "ward_id": rng.choice(WARDS),
+            "image_url": f"https://api.telegram.org/file/bot/photos/file_{i}.jpg",
+            "description": rng.choice(["Garbage pile near the station, mosquitoes everywhere", "Water logging on the road", "Open drain overflowing"]),
+            "severity": rng.randint(1, 10),
+            "type": rng.choice(TYPES),
+            "location": ewkb_point(19.0 + rng.random() * 0.25, 72.8 + rng.random() * 0.15),
+            "chat_id": rng.randint(10**8, 10**10),
+            "duplicate_of": None,
+            "verified": rng.random() < 0.3,
+            "created_at": (start + timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def project(rows: list, columns: str) -> list:
+    """
+    What PostgREST returns for select(columns): fresh dicts holding only those keys.
+    """
+    keys = [c.strip() for c in columns.split(",")]
+    return [{key: row[key] for key in keys} for row in rows]
+
+
+def bucket(items, ward_of) -> dict:
+    buckets = {}
+    for item in items:
+        buckets.setdefault(ward_of(item), []).append(item)
+    return buckets
+
+
+def scan_dicts(buckets: dict) -> dict:
+    return {
+        ward: (len(rows), sum(r.get("severity", 5) for r in rows) / len(rows), Counter(r.get("type", "Unknown") for r in rows))
+        for ward, rows in buckets.items()
+    }
+
+
+def scan_reports(buckets: dict) -> dict:
+    return {
+        ward: (len(reports), sum(r.severity for r in reports) / len(reports), Counter(r.type for r in reports))
+        for ward, reports in buckets.items()
+    }
+
+
+def measure(build):
+    """
+    Returns (result, peak MB while building, MB still held afterwards).
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 2**20, held / 2**20
+
+
+def best_of(runs: int, func):
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+for n in SIZES:
+    # Each build parses the JSON body PostgREST would send, so rows are freshly allocated
+    source = make_rows(n)
+    full_body = json.dumps(source)
+    projected = project(source, BRAIN_COLUMNS["reports"])
+    projected_body = json.dumps(projected)
+    page_bodies = [json.dumps(projected[i:i + PAGE_SIZE]) for i in range(0, n, PAGE_SIZE)]
+    del source, projected
+
+    dict_buckets, dict_peak, dict_held = measure(lambda: bucket(json.loads(full_body), lambda r: r["ward_id"]))
+    report_buckets, report_peak, report_held = measure(
+        lambda: bucket([Report.from_row(row) for row in json.loads(projected_body)], lambda r: r.ward_id)
+    )
+    paged_buckets, paged_peak, paged_held = measure(
+        lambda: bucket([Report.from_row(row) for body in page_bodies for row in json.loads(body)], lambda r: r.ward_id)
+    )
+
+    dict_scan, dict_seconds = best_of(3, lambda: scan_dicts(dict_buckets))
+    report_scan, report_seconds = best_of(3, lambda: scan_reports(report_buckets))
+    identical = dict_scan == report_scan
+
+    print(f"📊 {n:>9,} reports            peak MB    held MB    scan ms")
+    print(f"   select('*') dicts   : {dict_peak:9.1f} {dict_held:10.1f} {dict_seconds * 1000:10.1f}")
+    print(f"   __slots__ Reports   : {report_peak:9.1f} {report_held:10.1f} {report_seconds * 1000:10.1f}")
+    print(f"   Reports, paged      : {paged_peak:9.1f} {paged_held:10.1f}       (pages of {PAGE_SIZE:,})")
+    print(f"   held vs dicts       : {dict_held / report_held:8.1f}x")
+    print(f"   identical           : {'✅' if identical else '❌'}")
+    del dict_buckets, report_buckets, paged_buckets
@@ -0,0 +1,47 @@
+"""
+Benchmark: scalar calculate_risk_score loop vs vectorized calculate_risk_scores.
+Also checks that both produce bit-for-bit identical scores.
+
+    python benchmark_risk_score.py
+"""
+import time
+import numpy as np
+from tools import calculate_risk_score, calculate_risk_scores, risk_statuses
+
+SIZES = [10_000, 1_000_000]
+
+
+def make_cells(n: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    # Values straddle every threshold, including exact boundaries (5.0, 10.0, 60, 80)
+    rain = rng.choice([0.0, 0.2, 5.0, 5.1, 10.0, 10.5, 30.0], n) * rng.choice([1.0, 1.0, 0.5], n)
+    humidity = rng.integers(40, 101, n).astype(np.float64)
+    reports = rng.integers(0, 15, n)
+    verified = rng.integers(0, 8, n)
+    return rain, humidity, reports, verified
+
+
+for n in SIZES:
+    rain, humidity, reports, verified = make_cells(n)
+    # Scalar input as the API builds it: one weather dict per cell
+    weather = [{"current": {"rain": float(r), "relative_humidity_2m": float(h)}} for r, h in zip(rain, humidity)]
+    report_list = reports.tolist()
+    verified_list = verified.tolist()
+
+    started = time.perf_counter()
+    scalar = [calculate_risk_score(w, c, v) for w, c, v in zip(weather, report_list, verified_list)]
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vector = calculate_risk_scores(rain, humidity, reports, verified)
+    statuses = risk_statuses(vector)
+    vector_seconds = time.perf_counter() - started
+
+    identical = np.array_equal(np.array(scalar, dtype=np.float64).view(np.int64), vector.view(np.int64))
+    print(f"📊 {n:>9,} cells")
+    print(f"   scalar loop : {scalar_seconds * 1000:9.1f} ms")
+    print(f"   vectorized  : {vector_seconds * 1000:9.1f} ms (scores + status buckets)")
+    print(f"   speedup     : {scalar_seconds / vector_seconds:9.1f}x")
+    print(f"   identical   : {'✅' if identical else '❌'}")
+    labels, counts = np.unique(statuses, return_counts=True)
+    print(f"   statuses    : {dict(zip(labels.tolist(), counts.tolist()))}")
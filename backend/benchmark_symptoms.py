@@ -0,0 +1,94 @@
+"""
+Benchmark: the previous per-keyword analyze_symptoms loop vs the single-pass matcher.
+The per-keyword loop is timed both with the original 7 keywords and with every alias
+in SYMPTOM_ALIASES (the cost it would have had with the multilingual vocabulary).
+Also checks both pick the same top symptoms on plain English descriptions, where the
+old substring check and the new whole-word aliases agree.
+
+    python benchmark_symptoms.py
+"""
+import random
+import time
+from symptoms import SYMPTOM_ALIASES, SymptomCounter, count_symptoms
+
+SIZES = [10_000, 1_000_000]
+VOCABULARY = ["fever", "joint pain", "chills", "cough", "headache", "rash", "nausea"]
+ALL_ALIASES = [(symptom, alias.lower()) for symptom, aliases in SYMPTOM_ALIASES.items() for alias in aliases]
+FILLER = ["since two days", "near the station", "my son has", "also", "and", "very bad", "at night", "help"]
+
+
+# Reference: analyze_symptoms before it moved to symptoms.py
+def legacy_analyze_symptoms(reports: list) -> dict:
+    """
+    Extracts and counts symptoms from a list of report descriptions.
+    """
+    symptoms = {
+        "fever": 0,
+        "joint pain": 0,
+        "chills": 0,
+        "cough": 0,
+        "headache": 0,
+        "rash": 0,
+        "nausea": 0
+    }
+    
+    for report in reports:
+        text = report.get("description", "").lower()
+        for symptom in symptoms:
+            if symptom in text:
+                symptoms[symptom] += 1
+                
+    # Return top 3 trending
+    sorted_symptoms = sorted(symptoms.items(), key=lambda x: x[1], reverse=True)[:3]
+    return [s[0] for s in sorted_symptoms if s[1] > 0]
+
+
+def per_alias_counts(reports: list) -> dict:
+    """
+    The legacy loop extended to every alias: one substring search per alias per report.
+    """
+    counts = dict.fromkeys(SYMPTOM_ALIASES, 0)
+    for report in reports:
+        text = report.get("description", "").lower()
+        for symptom in {symptom for symptom, alias in ALL_ALIASES if alias in text}:
+            counts[symptom] += 1
+    return counts
+
+
+def make_reports(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    weights = [8, 3, 2, 5, 4, 1, 2]  # Skewed so the top 3 is stable
+    reports = []
+    for _ in range(n):
+        words = rng.choices(VOCABULARY, weights=weights, k=rng.randint(0, 3)) + rng.sample(FILLER, 3)
+        rng.shuffle(words)
+        text = ", ".join(words)
+        reports.append({"description": text.capitalize() if rng.random() < 0.5 else text.upper()})
+    return reports
+
+
+for n in SIZES:
+    reports = make_reports(n)
+
+    started = time.perf_counter()
+    legacy = legacy_analyze_symptoms(reports)
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    per_alias_counts(reports)
+    per_alias_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    counter = SymptomCounter()
+    counter.add_reports(reports)
+    top = counter.top(3)
+    matcher_seconds = time.perf_counter() - started
+
+    print(f"📊 {n:>9,} reports")
+    print(f"   per-keyword loop : {legacy_seconds * 1000:9.1f} ms ({len(VOCABULARY)} keywords)")
+    print(f"   per-alias loop   : {per_alias_seconds * 1000:9.1f} ms ({len(ALL_ALIASES)} aliases)")
+    print(f"   single pass      : {matcher_seconds * 1000:9.1f} ms ({len(ALL_ALIASES)} aliases, full counts)")
+    print(f"   vs per-alias     : {per_alias_seconds / matcher_seconds:9.1f}x")
+    print(f"   same top 3       : {'✅' if legacy == top else '❌'} {top}")
+
+print(f"🔤 Multilingual sample: {count_symptoms([{'description': 'Bukhar aur sir dard, खांसी bhi'}])}")
@@ -1,10 +1,17 @@
 import os
-import time
+import asyncio
 import json
+import hashlib
 import logging
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from supabase import create_client, Client
 import google.generativeai as genai
+from llm_cache import cached_llm_call_async
+from spatial_index import load_ward_index
+from reports import BRAIN_COLUMNS, Report, parse_timestamp
+from db import iter_pages, run_call, run_query
 
 # 1. Setup & Config
 load_dotenv()
@@ -31,100 +38,489 @@ genai.configure(api_key=GEMINI_KEY)
 # Use Gemini 2.5 Flash (latest model)
 model = genai.GenerativeModel('gemini-2.5-flash')
 
-def scan_grid():
+# Scan Config
+SCAN_INTERVAL = int(os.getenv("BRAIN_SCAN_INTERVAL", 30))
+WINDOW_HOURS = float(os.getenv("BRAIN_WINDOW_HOURS", 24))  # Reports older than this stop counting
+
+# Analysis Concurrency Config
+# Candidate wards are analyzed as background tasks, so slow Gemini calls never delay the next scan.
+ANALYSIS_CONCURRENCY = int(os.getenv("BRAIN_ANALYSIS_CONCURRENCY", 5))
+WARD_TIMEOUT = float(os.getenv("BRAIN_WARD_TIMEOUT", 60))
+
+# Wards that trip the threshold in the same scan are analyzed BATCH_SIZE per Gemini call (1 = no batching)
+BATCH_SIZE = max(1, int(os.getenv("BRAIN_BATCH_SIZE", 10)))
+BATCH_TIMEOUT = float(os.getenv("BRAIN_BATCH_TIMEOUT", 120))
+
+analysis_slots = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+analysis_tasks = {}  # ward_id -> asyncio.Task still running
+ward_names = {}      # ward_id -> name, wards rarely change
+ward_index = None    # WardIndex for reports filed without a ward_id
+
+class WardWindow:
+    """
+    Sliding window of recent reports bucketed by ward.
+
+    Each scan only fetches rows created at or after the watermark (the newest
+    created_at seen so far) and expires rows that slid out of the window, so a
+    cycle costs O(new reports) instead of O(table size).
+    """
+
+    def __init__(self, window_hours: float = WINDOW_HOURS):
+        self.window = timedelta(hours=window_hours)
+        self.reports = deque()   # Report objects in created_at order
+        self.ward_reports = {}   # ward_id -> {report_id: Report}
+        self.watermark = None
+        self._ids_at_watermark = set()  # Rows sharing the watermark timestamp, to skip on the next gte fetch
+
+    def since(self, now: datetime) -> datetime:
+        return self.watermark or now - self.window
+
+    def add(self, reports: list) -> int:
+        """
+        Adds Reports fetched in created_at order. Returns how many were new.
+        """
+        added = 0
+        for report in reports:
+            created_at = report.created_at
+            report_id = report.id
+            
+            if self.watermark is not None:
+                if created_at < self.watermark:
+                    continue
+                if created_at == self.watermark and report_id in self._ids_at_watermark:
+                    continue
+            
+            if self.watermark is None or created_at > self.watermark:
+                self.watermark = created_at
+                self._ids_at_watermark = set()
+            self._ids_at_watermark.add(report_id)
+            
+            ward_id = report.ward_id
+            if not ward_id or report.duplicate_of:
+                continue  # Forwarded copies of a photo are linked to the original, not counted again
+            self.reports.append(report)
+            self.ward_reports.setdefault(ward_id, {})[report_id] = report
+            added += 1
+        return added
+
+    def expire(self, now: datetime) -> int:
+        """
+        Drops reports older than the window. Returns how many were dropped.
+        """
+        cutoff = now - self.window
+        dropped = 0
+        while self.reports and self.reports[0].created_at < cutoff:
+            report = self.reports.popleft()
+            bucket = self.ward_reports.get(report.ward_id, {})
+            bucket.pop(report.id, None)
+            if not bucket:
+                self.ward_reports.pop(report.ward_id, None)
+            dropped += 1
+        return dropped
+
+# Alert Dedup Config
+# After an alert, a ward is only re-analyzed once the cooldown has passed and new reports
+# arrived, or earlier if enough new reports / a severity jump materially change the picture.
+ALERT_COOLDOWN_MINUTES = float(os.getenv("BRAIN_ALERT_COOLDOWN_MINUTES", 120))
+MATERIAL_NEW_REPORTS = int(os.getenv("BRAIN_MATERIAL_NEW_REPORTS", 3))
+MATERIAL_SEVERITY_DELTA = float(os.getenv("BRAIN_MATERIAL_SEVERITY_DELTA", 2.0))
+
+def average_severity(reports_data: list) -> float:
+    return sum(r.severity for r in reports_data) / len(reports_data)
+
+def evidence_fingerprint(reports_data: list) -> str:
+    """
+    Stable hash of the set of reports behind an alert.
+    """
+    report_ids = sorted(str(r.id) for r in reports_data)
+    return hashlib.sha1(",".join(report_ids).encode()).hexdigest()[:16]
+
+class AlertTracker:
+    """
+    Per-ward alert state machine: remembers the evidence behind the last alert
+    and decides whether a ward with enough reports deserves a new Gemini analysis.
+    """
+
+    def __init__(self, cooldown_minutes: float = ALERT_COOLDOWN_MINUTES):
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+        self.states = {}  # ward_id -> {fingerprint, report_ids, count, avg_severity, alerted_at}
+        self.stats = {"analyzed": 0, "skipped_unchanged": 0, "skipped_cooldown": 0}
+
+    def should_analyze(self, ward_id, reports_data: list, now: datetime):
+        """
+        Returns (bool, reason).
+        """
+        state = self.states.get(ward_id)
+        if state is None:
+            return self._decide(True, "analyzed", "first alert")
+        
+        if evidence_fingerprint(reports_data) == state["fingerprint"]:
+            return self._decide(False, "skipped_unchanged", "no new reports")
+        
+        report_ids = {str(r.id) for r in reports_data}
+        if state["report_ids"] is not None:
+            new_reports = len(report_ids - state["report_ids"])
+        else:
+            # Seeded from the alerts table after a restart: only the count is known
+            new_reports = max(len(report_ids) - state["count"], 0)
+        if new_reports == 0:
+            return self._decide(False, "skipped_unchanged", "no new reports")
+        
+        if now - state["alerted_at"] >= self.cooldown:
+            return self._decide(True, "analyzed", f"{new_reports} new reports after cooldown")
+        
+        severity_delta = average_severity(reports_data) - state["avg_severity"]
+        if new_reports >= MATERIAL_NEW_REPORTS or severity_delta >= MATERIAL_SEVERITY_DELTA:
+            return self._decide(True, "analyzed", f"material change (+{new_reports} reports, severity {severity_delta:+.1f})")
+        return self._decide(False, "skipped_cooldown", f"cooldown (+{new_reports} reports)")
+
+    def record_alert(self, ward_id, reports_data: list, now: datetime):
+        self.states[ward_id] = {
+            "fingerprint": evidence_fingerprint(reports_data),
+            "report_ids": {str(r.id) for r in reports_data},
+            "count": len(reports_data),
+            "avg_severity": average_severity(reports_data),
+            "alerted_at": now,
+        }
+
+    def seed(self, alert_rows: list):
+        """
+        Restores cooldowns from recent alerts (newest first) so a restart does not re-alert every ward.
+        """
+        for row in alert_rows:
+            ward_id = row.get("ward_id")
+            evidence = (row.get("action_plan") or {}).get("evidence") or {}
+            if not ward_id or ward_id in self.states or not evidence.get("fingerprint"):
+                continue
+            self.states[ward_id] = {
+                "fingerprint": evidence["fingerprint"],
+                "report_ids": None,
+                "count": evidence.get("report_count", 0),
+                "avg_severity": evidence.get("avg_severity", 0.0),
+                "alerted_at": parse_timestamp(row["created_at"]),
+            }
+
+    def _decide(self, analyze: bool, stat: str, reason: str):
+        self.stats[stat] += 1
+        return analyze, reason
+
+window = WardWindow()
+alerts = AlertTracker()
+reports_table = "reports"
+
+async def load_alert_state():
     """
-    Scans the reports table (used by telegram bot), aggregates by ward, and triggers Gemini analysis
-    if a ward has 2 or more reports.
+    Seeds the alert tracker from alerts published within the cooldown window.
+    """
+    since = datetime.now(timezone.utc) - alerts.cooldown
+    try:
+        response = await run_query(supabase.table('alerts')
+            .select('ward_id, created_at, action_plan')
+            .gte('created_at', since.isoformat())
+            .order('created_at', desc=True), "alerts.cooldown_seed")
+        alerts.seed(response.data)
+        logger.info(f"   Restored alert cooldowns for {len(alerts.states)} wards.")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not restore alert cooldowns: {e}")
+
+async def load_wards():
+    """
+    Builds the local ward index used to place reports that arrive without a ward_id.
+    """
+    global ward_index
+    try:
+        ward_index = await run_call(load_ward_index, supabase, name="wards.index")
+        ward_names.update({w["id"]: w["name"] for w in ward_index.wards})
+        logger.info(f"   Loaded ward index ({len(ward_index.wards)} wards).")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load ward index, reports without ward_id are skipped: {e}")
+
+def resolve_wards(reports: list) -> int:
+    """
+    Fills in missing ward_id from the report location. Returns how many were resolved.
+    """
+    if ward_index is None:
+        return 0
+    resolved = 0
+    for report in reports:
+        if not report.ward_id and report.lat is not None:
+            ward = ward_index.lookup(report.lat, report.lon)
+            if ward is not None:
+                report.ward_id = ward["id"]
+                resolved += 1
+    return resolved
+
+async def fetch_new_reports(since: datetime):
+    """
+    Yields pages of reports created at or after `since`, oldest first, as compact Reports.
+    """
+    global reports_table
+    try:
+        build_query = lambda: supabase.table(reports_table).select(BRAIN_COLUMNS[reports_table])\
+            .gte("created_at", since.isoformat())
+        async for page in iter_pages(build_query, f"{reports_table}.window"):
+            yield [Report.from_row(row) for row in page]
+    except Exception as e:
+        if reports_table == "reports" and "Could not find the table 'public.reports'" in str(e):
+            logger.warning("⚠️ 'reports' table not found. Creating it...")
+            # The table will be created by create_missing_tables.sql
+            # For now, use citizen_reports as fallback
+            reports_table = "citizen_reports"
+            logger.info("   Using 'citizen_reports' instead.")
+            async for page in fetch_new_reports(since):
+                yield page
+            return
+        raise e
+
+async def load_new_reports(now: datetime) -> int:
+    """
+    Adds reports newer than the watermark to the window page by page. Returns how many were new.
+    Each page is added as it arrives, so a large backlog (e.g. the first scan after startup)
+    that outlasts one scan is picked up where it stopped on the next.
+    """
+    added = 0
+    async for reports in fetch_new_reports(window.since(now)):
+        resolve_wards(reports)
+        added += window.add(reports)
+    return added
+
+async def scan_grid():
+    """
+    Scans the reports table (used by telegram bot) incrementally, keeps per-ward counts over
+    the last WINDOW_HOURS, and starts a Gemini analysis task for wards with 2 or more reports.
     """
     logger.info("📡 Scanning Grid for outbreaks...")
     
     try:
-        # 1. Fetch all reports from the 'reports' table (telegram bot reports)
-        # In production, filter by created_at within last 24-48 hours
+        # 1. Fetch only reports newer than the watermark and age out old ones
+        now = datetime.now(timezone.utc)
+        in_window = len(window.reports)
         try:
-            response = supabase.table("reports").select("*").execute()
-            reports = response.data
-        except Exception as e:
-            if "Could not find the table 'public.reports'" in str(e):
-                logger.warning("⚠️ 'reports' table not found. Creating it...")
-                # The table will be created by create_missing_tables.sql
-                # For now, use citizen_reports as fallback
-                response = supabase.table("citizen_reports").select("*").execute()
-                reports = response.data
-                logger.info("   Using 'citizen_reports' instead.")
-            else:
-                raise e
+            await asyncio.wait_for(load_new_reports(now), timeout=SCAN_INTERVAL)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Report backlog not fully loaded within {SCAN_INTERVAL}s, continuing next scan.")
+        added = len(window.reports) - in_window
+        expired = window.expire(now)
+        logger.info(f"   +{added} new / -{expired} expired reports ({len(window.reports)} in window)")
         
-        if not reports:
+        if not window.ward_reports:
             logger.info("... No reports found.")
             return
 
-        # 2. Aggregate reports by ward_id
-        ward_counts = {}
-        ward_reports = {}  # Store actual reports for each ward
-        
-        for report in reports:
-            ward_id = report.get("ward_id")
-            if not ward_id:
-                continue
-                
-            ward_counts[ward_id] = ward_counts.get(ward_id, 0) + 1
-            if ward_id not in ward_reports:
-                ward_reports[ward_id] = []
-            ward_reports[ward_id].append(report)
-
-        # 3. Check for outbreaks
-        for ward_id, count in ward_counts.items():
+        # 2. Check for outbreaks
+        candidates = []
+        for ward_id, bucket in window.ward_reports.items():
+            count = len(bucket)
             # TRIGGER CONDITION: 2 or more reports
             if count >= 2:
-                logger.warning(f"⚠️ OUTBREAK CANDIDATE: Ward {ward_id} has {count} reports.")
-                process_outbreak(ward_id, count, ward_reports[ward_id])
+                if ward_id in analysis_tasks:
+                    logger.info(f"Ward {ward_id} analysis still running ({count} reports).")
+                    continue
+                reports_data = list(bucket.values())
+                analyze, reason = alerts.should_analyze(ward_id, reports_data, now)
+                if analyze:
+                    logger.warning(f"⚠️ OUTBREAK CANDIDATE: Ward {ward_id} has {count} reports ({reason}).")
+                    candidates.append((ward_id, count, reports_data))
+                else:
+                    logger.info(f"Ward {ward_id} already alerted, {count} reports ({reason}).")
             else:
                 logger.info(f"Ward {ward_id} stable ({count} reports).")
 
+        # 3. Analyze candidates, BATCH_SIZE wards per Gemini call
+        for i in range(0, len(candidates), BATCH_SIZE):
+            start_analysis(candidates[i:i + BATCH_SIZE])
+
     except Exception as e:
         logger.error(f"Scan Cycle Error: {e}")
 
-def process_outbreak(ward_id, count, reports_data):
+def start_analysis(candidates: list):
     """
-    Uses Gemini to analyze the outbreak and saves the alert to Supabase.
+    Runs process_outbreaks for a batch of (ward_id, count, reports_data) as a background task.
     """
+    task = asyncio.create_task(process_outbreaks(candidates))
+    for ward_id, _, _ in candidates:
+        analysis_tasks[ward_id] = task
+        task.add_done_callback(lambda t, ward_id=ward_id: analysis_tasks.pop(ward_id, None))
+
+async def get_ward_name(ward_id) -> str:
+    if ward_id in ward_names:
+        return ward_names[ward_id]
     try:
-        # 1. Get Ward Name for context
-        try:
-            w_res = supabase.table('wards').select('name').eq('id', ward_id).execute()
-            ward_name = w_res.data[0]['name'] if w_res.data else f"Zone-{ward_id}"
-        except:
-            ward_name = f"Zone-{ward_id}"
-
-        # 2. Aggregate report details for AI context
-        report_types = [r.get('type', 'Unknown') for r in reports_data]
-        avg_severity = sum([r.get('severity', 5) for r in reports_data]) / len(reports_data)
-        
-        # 3. AI Reasoning
-        prompt = f"""
-        You are the Mumbai Health Commissioner.
-        Ward: {ward_name} (ID: {ward_id})
-        Current Status: {count} critical citizen reports
-        Report Types: {', '.join(report_types)}
-        Average Severity: {avg_severity:.1f}/10
-        
-        Analyze the disease outbreak risk. Return STRICT JSON:
+        w_res = await run_query(supabase.table('wards').select('name').eq('id', ward_id), "wards.name")
+        ward_name = w_res.data[0]['name'] if w_res.data else f"Zone-{ward_id}"
+    except:
+        return f"Zone-{ward_id}"
+    ward_names[ward_id] = ward_name
+    return ward_name
+
+def parse_plan(text: str):
+    """
+    Parses Gemini output (optionally wrapped in ```json fences) into JSON.
+    """
+    return json.loads(text.replace('```json', '').replace('```', '').strip())
+
+def is_plan_json(text: str, batched: bool = False) -> bool:
+    """
+    Only well-formed answers are worth caching.
+    """
+    try:
+        parsed = parse_plan(text)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(parsed, list) if batched else is_valid_plan(parsed)
+
+async def generate_text(prompt: str) -> str:
+    response = await model.generate_content_async(prompt)
+    return response.text
+
+def is_valid_plan(plan) -> bool:
+    return (
+        isinstance(plan, dict)
+        and plan.get("alert_level") in ("HIGH", "CRITICAL")
+        and isinstance(plan.get("advisory_header"), str)
+        and isinstance(plan.get("public_message"), str)
+        and isinstance(plan.get("action_items"), list)
+    )
+
+async def process_outbreaks(candidates: list):
+    """
+    Analyzes a batch of candidate wards and publishes one alert per ward.
+    Several wards share a single Gemini call; wards missing or malformed in the
+    batched answer fall back to their own per-ward call.
+    """
+    wards = []
+    for ward_id, count, reports_data in candidates:
+        wards.append({
+            "ward_id": ward_id,
+            "ward_name": await get_ward_name(ward_id),
+            "count": count,
+            "reports_data": reports_data,
+            "avg_severity": average_severity(reports_data)
+        })
+
+    plans = {}
+    if len(wards) > 1:
+        async with analysis_slots:
+            try:
+                plans = await asyncio.wait_for(analyze_wards_batch(wards), timeout=BATCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error(f"❌ Batched analysis of {len(wards)} wards timed out after {BATCH_TIMEOUT:g}s")
+            except Exception as e:
+                logger.error(f"❌ Batched analysis of {len(wards)} wards failed: {e}")
+        if len(plans) < len(wards):
+            logger.warning(f"   Batch answered {len(plans)}/{len(wards)} wards, analyzing the rest one by one.")
+
+    await asyncio.gather(*[process_outbreak(ward, plans.get(ward["ward_id"])) for ward in wards])
+
+async def analyze_wards_batch(wards: list) -> dict:
+    """
+    Asks Gemini for all wards in one structured prompt. Returns {ward_id: plan} for valid entries only.
+    """
+    summaries = [
+        {
+            "ward_id": str(ward["ward_id"]),
+            "ward_name": ward["ward_name"],
+            "report_count": ward["count"],
+            "report_types": dict(Counter(r.type for r in ward["reports_data"])),
+            "average_severity": round(ward["avg_severity"], 1)
+        }
+        for ward in wards
+    ]
+    prompt = f"""
+    You are the Mumbai Health Commissioner.
+    Each ward below has critical citizen reports (report_types maps type -> count, severity is out of 10).
+    Wards: {json.dumps(summaries)}
+    
+    Analyze the disease outbreak risk for EACH ward. Return a STRICT JSON array with one object per ward:
+    [
         {{
+            "ward_id": "ward_id copied from the input",
             "alert_level": "HIGH" or "CRITICAL",
             "advisory_header": "Short Urgent Title (Max 5 words)",
             "public_message": "One sentence warning for citizens.",
             "action_items": ["Specific Action 1", "Specific Action 2", "Specific Action 3"]
         }}
-        """
-        
-        response = model.generate_content(prompt)
+    ]
+    """
+    
+    text = await cached_llm_call_async(
+        "brain_outbreak_batch", model.model_name, prompt, lambda: generate_text(prompt),
+        ttl=ALERT_COOLDOWN_MINUTES * 60, should_store=lambda t: is_plan_json(t, batched=True)
+    )
+    try:
+        entries = parse_plan(text)
+    except json.JSONDecodeError as e:
+        logger.error(f"❌ Error parsing batched JSON from Gemini: {e}")
+        return {}
+    if not isinstance(entries, list):
+        return {}
+    
+    requested = {str(ward["ward_id"]): ward["ward_id"] for ward in wards}
+    plans = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        ward_id = requested.get(str(entry.pop("ward_id", None)))
+        if ward_id is not None and is_valid_plan(entry):
+            plans[ward_id] = entry
+    return plans
+
+async def analyze_ward(ward: dict) -> dict:
+    """
+    Asks Gemini about a single ward.
+    """
+    report_types = [r.type for r in ward["reports_data"]]
+    prompt = f"""
+    You are the Mumbai Health Commissioner.
+    Ward: {ward["ward_name"]} (ID: {ward["ward_id"]})
+    Current Status: {ward["count"]} critical citizen reports
+    Report Types: {', '.join(report_types)}
+    Average Severity: {ward["avg_severity"]:.1f}/10
+    
+    Analyze the disease outbreak risk. Return STRICT JSON:
+    {{
+        "alert_level": "HIGH" or "CRITICAL",
+        "advisory_header": "Short Urgent Title (Max 5 words)",
+        "public_message": "One sentence warning for citizens.",
+        "action_items": ["Specific Action 1", "Specific Action 2", "Specific Action 3"]
+    }}
+    """
+    
+    text = await cached_llm_call_async(
+        "brain_outbreak", model.model_name, prompt, lambda: generate_text(prompt),
+        ttl=ALERT_COOLDOWN_MINUTES * 60, should_store=is_plan_json
+    )
+    try:
+        return parse_plan(text)
+    except json.JSONDecodeError:
+        logger.error(f"   Raw response: {text}")
+        raise
+
+async def process_outbreak(ward: dict, plan: dict = None):
+    """
+    Uses Gemini to analyze the outbreak (unless a batched plan is given) and saves the alert to Supabase.
+    """
+    ward_id = ward["ward_id"]
+    ward_name = ward["ward_name"]
+    reports_data = ward["reports_data"]
+    avg_severity = ward["avg_severity"]
+    try:
+        if plan is None:
+            async with analysis_slots:
+                try:
+                    plan = await asyncio.wait_for(analyze_ward(ward), timeout=WARD_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.error(f"❌ Analysis for Ward {ward_id} timed out after {WARD_TIMEOUT:g}s")
+                    return
         
-        # Clean JSON
-        text = response.text.replace('```json', '').replace('```', '').strip()
-        plan = json.loads(text)
+        # Remember which reports this alert covers (used to restore cooldowns after a restart)
+        plan["evidence"] = {
+            "fingerprint": evidence_fingerprint(reports_data),
+            "report_count": ward["count"],
+            "avg_severity": round(avg_severity, 2)
+        }
         
-        # 4. Save Alert to DB
+        # Save Alert to DB
         # Check if alerts table exists, if not use dispatch_tickets as fallback
         try:
             alert_payload = {
@@ -133,7 +529,8 @@ def process_outbreak(ward_id, count, reports_data):
                 "message": plan.get('advisory_header', 'Outbreak Alert'),
                 "action_plan": plan  # Store full JSON in jsonb column
             }
-            supabase.table('alerts').insert(alert_payload).execute()
+            await run_query(supabase.table('alerts').insert(alert_payload), "alerts.insert")
+            alerts.record_alert(ward_id, reports_data, datetime.now(timezone.utc))
             logger.info(f"✅ ALERT PUBLISHED for {ward_name}: {plan.get('advisory_header')}")
         except Exception as e:
             if "Could not find the table 'public.alerts'" in str(e):
@@ -145,25 +542,42 @@ def process_outbreak(ward_id, count, reports_data):
                     "reasoning": f"{plan.get('advisory_header')} - {plan.get('public_message')}",
                     "status": "pending"
                 }
-                supabase.table('dispatch_tickets').insert(ticket_payload).execute()
+                await run_query(supabase.table('dispatch_tickets').insert(ticket_payload), "dispatch_tickets.insert")
+                alerts.record_alert(ward_id, reports_data, datetime.now(timezone.utc))
                 logger.info(f"✅ DISPATCH TICKET CREATED for {ward_name}")
             else:
                 raise e
 
     except json.JSONDecodeError as e:
         logger.error(f"❌ Error parsing JSON from Gemini for Ward {ward_id}: {e}")
-        logger.error(f"   Raw response: {response.text if 'response' in locals() else 'N/A'}")
     except Exception as e:
         logger.error(f"❌ AI/DB Error for Ward {ward_id}: {e}")
 
+async def run_brain():
+    """
+    Scans on a fixed SCAN_INTERVAL cadence; analyses run alongside and never push the next scan back.
+    """
+    await load_alert_state()
+    await load_wards()
+    
+    loop = asyncio.get_running_loop()
+    next_scan = loop.time()
+    while True:
+        await scan_grid()
+        
+        # Skip ticks missed by an overrunning scan instead of bunching them up
+        next_scan += SCAN_INTERVAL
+        while next_scan <= loop.time():
+            next_scan += SCAN_INTERVAL
+        await asyncio.sleep(next_scan - loop.time())
+
 if __name__ == "__main__":
     logger.info("🧠 Sentinel Brain Service Started...")
     logger.info("   Press Ctrl+C to stop.")
-    logger.info("   Scanning every 30 seconds...")
+    logger.info(f"   Scanning every {SCAN_INTERVAL} seconds over the last {WINDOW_HOURS:g}h...")
+    logger.info(f"   Analyzing up to {ANALYSIS_CONCURRENCY} wards at once...")
     
     try:
-        while True:
-            scan_grid()
-            time.sleep(30)  # Scan every 30 seconds
+        asyncio.run(run_brain())
     except KeyboardInterrupt:
         logger.info("\n👋 Sentinel Brain shutting down gracefully...")
@@ -0,0 +1,206 @@
+import asyncio
+import time
+
+
+class AsyncTTLCache:
+    """
+    In-process async cache with TTL, single-flight loading and stale-while-revalidate.
+
+    - Fresh entries (younger than `ttl`) are returned straight from memory.
+    - Stale entries are still returned immediately, while exactly one background
+      refresh per key runs (stale-while-revalidate).
+    - Missing keys are loaded once; concurrent callers for the same key await the
+      same in-flight load instead of each hitting the upstream (single-flight).
+
+    `loader(key)` is an async function returning the value for a key.
+    `bulk_loader(keys)` (optional) returns {key: value} for many keys in one go
+    and is used by `get_many`. Values are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(self, loader, ttl: float, name: str = "cache", max_stale: float = None, bulk_loader=None):
+        self.loader = loader
+        self.bulk_loader = bulk_loader
+        self.ttl = ttl
+        self.max_stale = max_stale  # None = serve stale entries forever while refreshing
+        self.name = name
+        self._entries = {}   # key -> (stored_at, value)
+        self._inflight = {}  # key -> asyncio.Task
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+        }
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                return entry[1]
+            if self.max_stale is None or age < self.ttl + self.max_stale:
+                self.stats["stale_hits"] += 1
+                self.refresh(key)
+                return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = self._start_load(key)
+
+        # Shield so a cancelled caller does not cancel the load shared with others
+        return await asyncio.shield(task)
+
+    async def get_many(self, keys) -> dict:
+        """
+        Returns {key: value} for all keys. Keys that are neither cached nor already
+        loading are fetched together in a single `bulk_loader` call; stale keys are
+        returned immediately and refreshed together in the background.
+        """
+        results = {}
+        waiting = {}
+        missing = []
+        stale = []
+        now = time.monotonic()
+
+        for key in dict.fromkeys(keys):
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self.stats["hits"] += 1
+                    results[key] = entry[1]
+                    continue
+                if self.max_stale is None or age < self.ttl + self.max_stale:
+                    self.stats["stale_hits"] += 1
+                    results[key] = entry[1]
+                    if key not in self._inflight:
+                        stale.append(key)
+                    continue
+
+            task = self._inflight.get(key)
+            if task is not None:
+                self.stats["coalesced"] += 1
+                waiting[key] = task
+            else:
+                self.stats["misses"] += 1
+                missing.append(key)
+
+        if stale:
+            self.stats["refreshes"] += len(stale)
+            self._start_bulk_load(stale)
+        if missing:
+            waiting.update(self._start_bulk_load(missing))
+
+        for key, task in waiting.items():
+            results[key] = await asyncio.shield(task)
+        return results
+
+    async def reload_many(self, keys) -> dict:
+        """
+        Like `get_many`, but fetches every key upstream regardless of cached age
+        (joining loads already in flight) and stores the results.
+        """
+        keys = list(dict.fromkeys(keys))
+        waiting = {key: self._inflight[key] for key in keys if key in self._inflight}
+        missing = [key for key in keys if key not in waiting]
+        if missing:
+            self.stats["refreshes"] += len(missing)
+            waiting.update(self._start_bulk_load(missing))
+        return {key: await asyncio.shield(task) for key, task in waiting.items()}
+
+    def refresh(self, key):
+        """
+        Schedules a background reload of `key` unless one is already running.
+        """
+        if key in self._inflight:
+            return
+        self.stats["refreshes"] += 1
+        self._start_load(key)
+
+    def age(self, key):
+        """
+        Seconds since `key` was last stored, or None if it is not cached.
+        """
+        entry = self._entries.get(key)
+        return time.monotonic() - entry[0] if entry is not None else None
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def snapshot(self) -> dict:
+        """
+        Returns counters and sizing info for metrics endpoints.
+        """
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"] + self.stats["coalesced"]
+        served_from_memory = self.stats["hits"] + self.stats["stale_hits"]
+        return {
+            **self.stats,
+            "name": self.name,
+            "ttl_seconds": self.ttl,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_rate": round(served_from_memory / lookups, 4) if lookups else 0.0,
+        }
+
+    def _start_load(self, key):
+        task = asyncio.ensure_future(self._load(key))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish_load(key, t))
+        return task
+
+    def _start_bulk_load(self, keys) -> dict:
+        if self.bulk_loader is None:
+            return {key: self._start_load(key) for key in keys}
+
+        # One upstream call for the whole batch, but a per-key task so that
+        # single-key `get` callers can coalesce onto it as well
+        batch = asyncio.ensure_future(self._load_many(keys))
+        batch.add_done_callback(lambda t: self._report_error(f"{len(keys)} keys", t))
+        tasks = {}
+        for key in keys:
+            task = asyncio.ensure_future(self._pick(batch, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish_load(key, t, report=False))
+            tasks[key] = task
+        return tasks
+
+    async def _load_many(self, keys):
+        values = await self.bulk_loader(keys)
+        stored_at = time.monotonic()
+        for key, value in values.items():
+            self._entries[key] = (stored_at, value)
+        return values
+
+    async def _pick(self, batch, key):
+        values = await asyncio.shield(batch)
+        return values[key]
+
+    async def _load(self, key):
+        value = await self.loader(key)
+        self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def _finish_load(self, key, task, report=True):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        error = task.exception()  # Marks the exception as retrieved for background refreshes
+        if error is not None and report:
+            self._report_error(key, task)
+
+    def _report_error(self, what, task):
+        if task.cancelled() or task.exception() is None:
+            return
+        self.stats["errors"] += 1
+        print(f"⚠️ {self.name} load failed for {what}: {task.exception()}")
@@ -156,6 +156,7 @@ create table if not exists public.citizen_reports (
     user_id uuid references public.profiles(id),
     ward_id uuid references public.wards(id),
     location text not null,
+    location_key text, -- Canonical area key from gazetteer.py, e.g. 'andheri-east'
     description text,
     image_url text,
     verified boolean default false,
@@ -193,6 +194,7 @@ create table if not exists public.reports (
     type text, -- 'Garbage', 'Stagnant Water', etc.
     location geometry(Point, 4326), -- PostGIS point
     chat_id bigint, -- Telegram chat_id for notifications
+    duplicate_of uuid references public.reports(id), -- Set for forwarded copies of an earlier photo
     verified boolean default false,
     created_at timestamp with time zone default timezone('utc'::text, now()) not null
 );
@@ -295,10 +297,12 @@ create policy "Service role can manage subscriptions"
 -- ============================================================================
 create index if not exists reports_ward_id_idx on public.reports(ward_id);
 create index if not exists reports_created_at_idx on public.reports(created_at desc);
+create index if not exists reports_duplicate_of_idx on public.reports(duplicate_of) where duplicate_of is not null;
 create index if not exists alerts_ward_id_idx on public.alerts(ward_id);
 create index if not exists alerts_created_at_idx on public.alerts(created_at desc);
 create index if not exists citizen_reports_ward_id_idx on public.citizen_reports(ward_id);
 create index if not exists citizen_reports_created_at_idx on public.citizen_reports(created_at desc);
+create index if not exists citizen_reports_location_key_idx on public.citizen_reports(location_key, created_at desc);
 
 -- ============================================================================
 -- GRANT PERMISSIONS
@@ -9,6 +9,7 @@ create table if not exists public.reports (
     type text, -- 'Garbage', 'Stagnant Water', etc.
     location geometry(Point, 4326), -- PostGIS point for lat/lon
     chat_id bigint, -- Telegram chat_id for notifications
+    duplicate_of uuid references public.reports(id), -- Set for forwarded copies of an earlier photo
     verified boolean default false,
     created_at timestamp with time zone default timezone('utc'::text, now()) not null
 );
@@ -73,6 +74,7 @@ create policy "Service can insert alerts"
 -- Create indexes for performance
 create index if not exists reports_ward_id_idx on public.reports(ward_id);
 create index if not exists reports_created_at_idx on public.reports(created_at desc);
+create index if not exists reports_duplicate_of_idx on public.reports(duplicate_of) where duplicate_of is not null;
 create index if not exists alerts_ward_id_idx on public.alerts(ward_id);
 create index if not exists alerts_created_at_idx on public.alerts(created_at desc);
 
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from metrics import StageTimer
+
+# Data Access Config
+# supabase-py is synchronous, so queries run on a bounded thread pool. The client keeps
+# one pooled HTTP session, so worker threads reuse connections instead of reconnecting.
+DB_MAX_WORKERS = int(os.environ.get("DB_MAX_WORKERS", 16))
+DB_QUERY_TIMEOUT = float(os.environ.get("DB_QUERY_TIMEOUT", 15))
+
+# Paging Config
+# Large reads are fetched in keyset pages instead of one response that PostgREST would cut
+# off at its max-rows limit (1000 on Supabase). Keep PAGE_SIZE at or below that limit.
+PAGE_SIZE = int(os.environ.get("DB_PAGE_SIZE", 1000))
+
+db_pool = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db")
+query_timer = StageTimer()  # Per-query latency, keyed by the name passed to run_query
+db_stats = {"queries": 0, "errors": 0, "timeouts": 0, "inflight": 0}
+
+
+async def run_query(query, name: str, timeout: float = DB_QUERY_TIMEOUT):
+    """
+    Executes a built supabase/PostgREST query (anything with .execute()) off the
+    event loop and returns its response. `name` labels the query in the metrics.
+
+        response = await run_query(supabase.table("alerts").select("*"), "alerts.recent")
+    """
+    return await run_call(query.execute, name=name, timeout=timeout)
+
+
+async def run_call(func, *args, name: str, timeout: float = DB_QUERY_TIMEOUT, **kwargs):
+    """
+    Runs any blocking data-access call (e.g. load_ward_index) on the DB pool with timing.
+    On timeout the caller gets asyncio.TimeoutError; the worker thread finishes on its own.
+    """
+    loop = asyncio.get_running_loop()
+    db_stats["queries"] += 1
+    db_stats["inflight"] += 1
+    try:
+        with query_timer.time(name):
+            return await asyncio.wait_for(
+                loop.run_in_executor(db_pool, partial(func, *args, **kwargs)), timeout
+            )
+    except asyncio.TimeoutError:
+        db_stats["timeouts"] += 1
+        raise
+    except Exception:
+        db_stats["errors"] += 1
+        raise
+    finally:
+        db_stats["inflight"] -= 1
+
+
+async def iter_pages(build_query, name: str, page_size: int = PAGE_SIZE, timeout: float = DB_QUERY_TIMEOUT):
+    """
+    Yields lists of rows in (created_at, id) order, one page at a time, so memory stays
+    bounded by the page size. `build_query()` returns a fresh select with any filters;
+    its columns must include created_at and id.
+
+        async for page in iter_pages(lambda: supabase.table("reports").select("id, created_at"), "reports.all"):
+            ...
+
+    Keyset pagination resumes after the last row seen rather than using an offset, so
+    each page is an index range scan and rows inserted meanwhile are neither skipped
+    nor repeated.
+    """
+    last = None
+    while True:
+        query = build_query()
+        if last is not None:
+            created_at, row_id = last
+            query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})')
+        query = query.order("created_at").order("id").limit(page_size)
+        page = (await run_query(query, name, timeout)).data
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]["created_at"], page[-1]["id"]
+
+
+def db_snapshot() -> dict:
+    return {**db_stats, "max_workers": DB_MAX_WORKERS, "page_size": PAGE_SIZE, "queries_by_name": query_timer.snapshot()}
@@ -0,0 +1,181 @@
+import json
+import os
+from functools import lru_cache
+import numpy as np
+
+# Disease Rules Config
+# Rules are data: each disease sums weighted weather conditions and symptom keyword
+# groups, and the first probability level whose min score is reached is reported.
+# Set DISEASE_RULES_PATH to a JSON file with the same shape to replace the defaults
+# (see disease_rules.example.json, which adds cholera and typhoid) without touching code.
+DISEASE_RULES_PATH = os.environ.get("DISEASE_RULES_PATH")
+
+DEFAULT_RULES = [
+    {
+        # High humidity + Rain + High Fever/Joint Pain
+        "disease": "Dengue",
+        "vector": "Aedes Mosquito",
+        "conditions": [
+            {"field": "relative_humidity_2m", "op": ">", "value": 70, "weight": 1},
+            {"field": "rain", "op": ">", "value": 5, "weight": 1},
+        ],
+        "symptoms": [
+            {"any": ["fever"], "weight": 1},
+            {"any": ["joint", "bone"], "weight": 2},
+        ],
+        "levels": [{"min_score": 3, "probability": "High"}, {"min_score": 1, "probability": "Moderate"}],
+    },
+    {
+        # Stagnant water (Rain) + Chills/Sweating
+        "disease": "Malaria",
+        "vector": "Anopheles Mosquito",
+        "conditions": [
+            {"field": "rain", "op": ">", "value": 10, "weight": 2},
+        ],
+        "symptoms": [
+            {"any": ["chills"], "weight": 2},
+            {"any": ["sweat"], "weight": 1},
+        ],
+        "levels": [{"min_score": 3, "probability": "High"}],
+    },
+    {
+        # Heavy Rain (Flooding) + Muscle Pain
+        "disease": "Leptospirosis",
+        "vector": "Contaminated Water",
+        "conditions": [
+            {"field": "rain", "op": ">", "value": 20, "weight": 3},
+        ],
+        "symptoms": [
+            {"any": ["muscle", "calf"], "weight": 2},
+        ],
+        "levels": [{"min_score": 3, "probability": "High"}],
+    },
+]
+
+OPS = {">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal}
+
+
+class CompiledRules:
+    """
+    Disease rules compiled into weight matrices, so every (ward, disease) pair is
+    scored in one batched pass:
+
+        scores = condition_hits @ condition_weights + symptom_hits @ symptom_weights
+
+    Symptom keywords are matched as substrings of each lower-cased symptom term, so
+    results equal the old "keyword in ' '.join(symptoms)" check for any keyword that
+    does not straddle two terms (true for the analyze_symptoms vocabulary).
+    """
+
+    def __init__(self, rules: list):
+        self.rules = rules
+        self.diseases = [rule["disease"] for rule in rules]
+        self.vectors = [rule.get("vector", "") for rule in rules]
+
+        # Weather conditions: one column per (disease, condition)
+        conditions = [(d, c) for d, rule in enumerate(rules) for c in rule.get("conditions", [])]
+        self.fields = sorted({c["field"] for _, c in conditions})
+        self.condition_fields = [self.fields.index(c["field"]) for _, c in conditions]
+        self.condition_ops = [OPS[c["op"]] for _, c in conditions]
+        self.condition_values = np.array([c["value"] for _, c in conditions], dtype=np.float64)
+        self.condition_weights = np.zeros((len(conditions), len(rules)))
+        for i, (d, c) in enumerate(conditions):
+            self.condition_weights[i, d] = c["weight"]
+
+        # Symptom groups: a group fires if any of its keywords is present
+        groups = [(d, g) for d, rule in enumerate(rules) for g in rule.get("symptoms", [])]
+        self.keywords = sorted({k.lower() for _, g in groups for k in g["any"]})
+        self.group_keywords = np.zeros((len(groups), len(self.keywords)), dtype=bool)
+        self.symptom_weights = np.zeros((len(groups), len(rules)))
+        for i, (d, g) in enumerate(groups):
+            for k in g["any"]:
+                self.group_keywords[i, self.keywords.index(k.lower())] = True
+            self.symptom_weights[i, d] = g["weight"]
+
+        # Levels: (diseases, max levels) min scores, highest first; +inf pads unused slots
+        depth = max(len(rule["levels"]) for rule in rules)
+        self.level_scores = np.full((len(rules), depth), np.inf)
+        self.level_labels = []
+        for d, rule in enumerate(rules):
+            levels = sorted(rule["levels"], key=lambda l: l["min_score"], reverse=True)
+            self.level_scores[d, :len(levels)] = [l["min_score"] for l in levels]
+            self.level_labels.append([l["probability"] for l in levels])
+
+        self._term_keywords = lru_cache(maxsize=4096)(self._match_keywords)
+        self._outcomes = {}  # levels row -> prebuilt risk dicts, there are few distinct rows
+
+    def _match_keywords(self, term: str) -> list:
+        term = term.lower()
+        return [k for k, keyword in enumerate(self.keywords) if keyword in term]
+
+    def symptom_matrix(self, symptom_lists: list) -> np.ndarray:
+        """
+        (wards, keywords) presence matrix; each distinct symptom term is matched once
+        and its keyword columns are set for every ward reporting it.
+        """
+        rows, columns = [], []
+        for w, symptoms in enumerate(symptom_lists):
+            for term in symptoms:
+                matched = self._term_keywords(term)
+                rows += [w] * len(matched)
+                columns += matched
+        matrix = np.zeros((len(symptom_lists), len(self.keywords)), dtype=bool)
+        matrix[rows, columns] = True  # One scatter, per-element numpy writes are slow
+        return matrix
+
+    def score(self, features: dict, symptom_hits: np.ndarray) -> np.ndarray:
+        """
+        `features` maps field name -> (wards,) array. Returns (wards, diseases) scores.
+        """
+        wards = symptom_hits.shape[0]
+        columns = [np.asarray(features.get(f, np.zeros(wards)), dtype=np.float64) for f in self.fields]
+        condition_hits = np.zeros((wards, len(self.condition_ops)))
+        for i, (field, op) in enumerate(zip(self.condition_fields, self.condition_ops)):
+            condition_hits[:, i] = op(columns[field], self.condition_values[i])
+        group_hits = (symptom_hits.astype(np.float64) @ self.group_keywords.T.astype(np.float64)) > 0
+        return condition_hits @ self.condition_weights + group_hits @ self.symptom_weights
+
+    def levels(self, scores: np.ndarray) -> np.ndarray:
+        """
+        (wards, diseases) index of the first level reached, -1 where none is.
+        """
+        reached = scores[:, :, None] >= self.level_scores[None, :, :]
+        return np.where(reached.any(axis=2), reached.argmax(axis=2), -1)
+
+    def predict_many(self, weather_list: list, symptom_lists: list) -> list:
+        """
+        Batched predict_disease_risk: one list of risk dicts per ward. Wards with the
+        same outcome share the (read-only) risk dicts.
+        """
+        currents = [w.get("current", {}) for w in weather_list]
+        features = {f: np.array([c.get(f, 0) for c in currents], dtype=np.float64) for f in self.fields}
+        levels = self.levels(self.score(features, self.symptom_matrix(symptom_lists)))
+
+        # Few distinct outcomes exist: encode each levels row as one integer, build
+        # every distinct outcome once and fan it out
+        radix = self.level_scores.shape[1] + 1
+        codes = (levels + 1) @ (radix ** np.arange(len(self.diseases)))
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        first = np.zeros(len(unique_codes), dtype=np.int64)
+        first[inverse[::-1]] = np.arange(len(inverse))[::-1]  # A ward holding each code
+        outcomes = [self._outcome(tuple(levels[i].tolist())) for i in first]
+        return [list(outcomes[i]) for i in inverse.tolist()]
+
+    def _outcome(self, row: tuple) -> list:
+        outcome = self._outcomes.get(row)
+        if outcome is None:
+            outcome = self._outcomes[row] = [
+                {"disease": self.diseases[d], "probability": self.level_labels[d][level], "vector": self.vectors[d]}
+                for d, level in enumerate(row) if level >= 0
+            ]
+        return outcome
+
+
+def load_rules(path: str = DISEASE_RULES_PATH) -> list:
+    if not path:
+        return DEFAULT_RULES
+    with open(path) as f:
+        return json.load(f)
+
+
+disease_rules = CompiledRules(load_rules())
@@ -0,0 +1,159 @@
+"""
+Local gazetteer: ward centroids and canonical location keys for Mumbai areas.
+
+The wards table has a `boundary` column but the seed data leaves it empty, so
+ward resolution works off these approximate neighbourhood centroids instead.
+"""
+import difflib
+import re
+from functools import lru_cache
+
+# Ward name (as in the wards table) -> (lat, lon)
+WARD_CENTROIDS = {
+    "Andheri East": (19.1136, 72.8697),
+    "Andheri West": (19.1197, 72.8305),
+    "Bandra East": (19.0625, 72.8437),
+    "Bandra West": (19.0596, 72.8295),
+    "Borivali East": (19.2290, 72.8680),
+    "Borivali West": (19.2307, 72.8467),
+    "Chembur": (19.0522, 72.8999),
+    "Dadar": (19.0178, 72.8478),
+    "Dharavi": (19.0380, 72.8538),
+    "Goregaon East": (19.1650, 72.8650),
+    "Goregaon West": (19.1663, 72.8440),
+    "Juhu": (19.1075, 72.8263),
+    "Kurla": (19.0726, 72.8793),
+    "Malad East": (19.1870, 72.8600),
+    "Malad West": (19.1874, 72.8400),
+    "Powai": (19.1197, 72.9051),
+    "Santacruz East": (19.0810, 72.8500),
+    "Santacruz West": (19.0843, 72.8360),
+    "Versova": (19.1310, 72.8150),
+    "Vile Parle": (19.0990, 72.8450),
+    "Worli": (19.0166, 72.8172),
+    "Vikhroli": (19.1119, 72.9278),
+    "Mulund": (19.1726, 72.9425),
+    "Ghatkopar": (19.0860, 72.9090),
+}
+
+# Location Keys
+# Free-text report locations are normalized at write time to a canonical area key
+# (e.g. "Andheri (E) station" -> "andheri-east"), stored in citizen_reports.location_key
+# and matched on read with an indexed equality lookup instead of ilike '%...%'.
+FUZZY_CUTOFF = 0.85  # difflib ratio for misspellings like "bandra wst"
+
+# Canonical key -> (display name, parent key or None, extra aliases)
+AREAS = {
+    "andheri": ("Andheri", None, []),
+    "andheri-east": ("Andheri East", "andheri", ["andheri e", "andheri (e)", "andheri purv", "अंधेरी पूर्व"]),
+    "andheri-west": ("Andheri West", "andheri", ["andheri w", "andheri (w)", "andheri paschim", "अंधेरी पश्चिम"]),
+    "bandra": ("Bandra", None, ["vandre", "वांद्रे", "बांद्रा"]),
+    "bandra-east": ("Bandra East", "bandra", ["bandra e", "bandra (e)", "bkc", "bandra kurla complex"]),
+    "bandra-west": ("Bandra West", "bandra", ["bandra w", "bandra (w)"]),
+    "borivali": ("Borivali", None, ["borivli", "बोरीवली"]),
+    "borivali-east": ("Borivali East", "borivali", ["borivali e", "borivali (e)"]),
+    "borivali-west": ("Borivali West", "borivali", ["borivali w", "borivali (w)"]),
+    "goregaon": ("Goregaon", None, ["गोरेगाव"]),
+    "goregaon-east": ("Goregaon East", "goregaon", ["goregaon e", "goregaon (e)"]),
+    "goregaon-west": ("Goregaon West", "goregaon", ["goregaon w", "goregaon (w)"]),
+    "malad": ("Malad", None, ["मालाड"]),
+    "malad-east": ("Malad East", "malad", ["malad e", "malad (e)"]),
+    "malad-west": ("Malad West", "malad", ["malad w", "malad (w)"]),
+    "santacruz": ("Santacruz", None, ["santa cruz", "सांताक्रूझ"]),
+    "santacruz-east": ("Santacruz East", "santacruz", ["santacruz e", "santacruz (e)", "santa cruz east"]),
+    "santacruz-west": ("Santacruz West", "santacruz", ["santacruz w", "santacruz (w)", "santa cruz west"]),
+    "chembur": ("Chembur", None, ["चेंबूर"]),
+    "colaba": ("Colaba", None, ["कुलाबा"]),
+    "dadar": ("Dadar", None, ["दादर"]),
+    "dahisar": ("Dahisar", None, ["दहिसर"]),
+    "dharavi": ("Dharavi", None, ["धारावी"]),
+    "fort": ("Fort", None, ["cst", "csmt"]),
+    "ghatkopar": ("Ghatkopar", None, ["घाटकोपर"]),
+    "juhu": ("Juhu", None, ["जुहू"]),
+    "kandivali": ("Kandivali", None, ["kandivli", "कांदिवली"]),
+    "kurla": ("Kurla", None, ["कुर्ला"]),
+    "malabar-hill": ("Malabar Hill", None, ["walkeshwar"]),
+    "marine-lines": ("Marine Lines", None, ["marine drive"]),
+    "mulund": ("Mulund", None, ["मुलुंड"]),
+    "powai": ("Powai", None, ["पवई"]),
+    "sion": ("Sion", None, ["शीव", "सायन"]),
+    "versova": ("Versova", None, ["वर्सोवा"]),
+    "vikhroli": ("Vikhroli", None, ["विक्रोळी"]),
+    "vile-parle": ("Vile Parle", None, ["parle", "vileparle", "विले पार्ले"]),
+    "worli": ("Worli", None, ["वरळी"]),
+}
+
+_NON_WORD = re.compile(r"[^\w\s()]+")
+
+
+def normalize_location(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def _build_aliases() -> dict:
+    aliases = {}
+    for key, (name, _, extra) in AREAS.items():
+        for alias in [name, key.replace("-", " "), *extra]:
+            aliases[normalize_location(alias)] = key
+    return aliases
+
+
+ALIASES = _build_aliases()  # normalized alias -> key
+ALIASES_BY_INITIAL = {}  # Fuzzy candidates share the first letter; typos rarely hit it
+for _alias in ALIASES:
+    ALIASES_BY_INITIAL.setdefault(_alias[0], []).append(_alias)
+MAX_ALIAS_WORDS = max(len(alias.split()) for alias in ALIASES)
+CHILDREN = {}
+for _key, (_, _parent, _) in AREAS.items():
+    if _parent:
+        CHILDREN.setdefault(_parent, []).append(_key)
+
+
+@lru_cache(maxsize=20000)
+def location_key(text: str):
+    """
+    Canonical area key for a free-text location, or None if nothing matches.
+
+    Tries the whole string, then word spans from longest to shortest, each first as an
+    exact alias (so "Near Andheri East station" -> "andheri-east") and then as a fuzzy
+    match against the aliases for typos.
+    """
+    if not text:
+        return None
+    normalized = normalize_location(text)
+    if normalized in ALIASES:
+        return ALIASES[normalized]
+
+    # Longest spans first, so "bandra wst" fuzzy-matches Bandra West before "bandra" alone wins
+    words = normalized.split()
+    for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+        spans = [" ".join(words[start:start + size]) for start in range(len(words) - size + 1)]
+        for span in spans:
+            if span in ALIASES:
+                return ALIASES[span]
+        for span in spans:
+            if len(span) < 5:
+                continue  # Short words fuzzy-match far too eagerly
+            candidates = ALIASES_BY_INITIAL.get(span[0], ())
+            match = difflib.get_close_matches(span, candidates, n=1, cutoff=FUZZY_CUTOFF)
+            if match:
+                return ALIASES[match[0]]
+    return None
+
+
+def location_keys_for(text: str, include_parent: bool = True) -> list:
+    """
+    Keys to query for a location: the area itself, its sub-areas ("Andheri" covers
+    Andheri East and West) and, unless `include_parent` is False, its parent area
+    (reports filed just as "Andheri" are relevant to Andheri East too). Per-ward
+    counts leave the parent out so such reports are not counted in both halves.
+    Empty if the location is unknown.
+    """
+    key = location_key(text)
+    if key is None:
+        return []
+    keys = [key, *CHILDREN.get(key, [])]
+    parent = AREAS[key][1]
+    if parent and include_parent:
+        keys.append(parent)
+    return keys
@@ -0,0 +1,38 @@
+import io
+import os
+from PIL import Image, ImageOps
+
+# Image Pipeline Config
+# Garbage piles and standing water are large, low-detail features; 1024px on the long
+# side at JPEG q80 keeps them clearly visible at a fraction of the original size.
+IMAGE_MAX_SIDE = int(os.environ.get("IMAGE_MAX_SIDE", 1024))
+IMAGE_JPEG_QUALITY = int(os.environ.get("IMAGE_JPEG_QUALITY", 80))
+
+
+def pick_photo_size(sizes: list, target: int = IMAGE_MAX_SIDE):
+    """
+    Picks the smallest Telegram PhotoSize whose long side still covers `target`,
+    falling back to the largest one. Telegram lists sizes smallest first.
+    """
+    for size in sizes:
+        if max(size.width, size.height) >= target:
+            return size
+    return sizes[-1]
+
+
+def prepare_image(data: bytes, max_side: int = IMAGE_MAX_SIDE, quality: int = IMAGE_JPEG_QUALITY) -> bytes:
+    """
+    Downscales an image so its long side is at most `max_side` and re-encodes it as JPEG.
+    Returns the original bytes if re-encoding would not make them smaller.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)  # Keep phone photos upright once EXIF is dropped
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=quality, optimize=True)
+
+    encoded = out.getvalue()
+    return encoded if len(encoded) < len(data) else bytes(data)
@@ -0,0 +1,186 @@
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# LLM Cache Config
+# One SQLite file shared by the API (web scout), brain.py and telegram_bot.py.
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", str(Path(__file__).parent / ".llm_cache.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 5000))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", 86400))
+FLUSH_EVERY = 100  # Lookups between writes of buffered last_used times and hit/miss counts
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Collapses whitespace so re-indented f-string prompts hash the same.
+    """
+    return " ".join(prompt.split())
+
+
+class LLMCache:
+    """
+    Disk-backed, content-addressed cache of LLM text responses.
+
+    Keys are a SHA-256 of (model name, normalized prompt, extra inputs). Entries expire
+    after their TTL, and the least recently used entries are evicted once the cache
+    holds more than `max_entries` (checked on every write). Hit/miss
+    counters are kept per call site, both for this process and cumulatively on
+    disk across all services.
+
+    Lookups only read: last_used times and the on-disk counters are buffered in
+    memory and written in one transaction on the next put, prune or snapshot, or
+    after FLUSH_EVERY lookups.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {}  # site -> {"hits", "misses", "stores"} for this process
+        self._touched = {}  # key -> last_used, not yet written
+        self._pending_counts = {}  # site -> {"hits", "misses"}, not yet written
+        self._lookups = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # Several processes read/write the same file
+        self._conn.execute("""
+            create table if not exists responses (
+                key text primary key,
+                site text not null,
+                response text not null,
+                created_at real not null,
+                expires_at real not null,
+                last_used real not null
+            )
+        """)
+        self._conn.execute("create index if not exists responses_last_used_idx on responses(last_used)")
+        self._conn.execute("""
+            create table if not exists site_stats (
+                site text primary key,
+                hits integer not null default 0,
+                misses integer not null default 0
+            )
+        """)
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str, inputs=None) -> str:
+        material = json.dumps([model_name, normalize_prompt(prompt), inputs], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str, site: str):
+        """
+        Returns the cached response or None.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "select response from responses where key = ? and expires_at > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                self._touched[key] = now
+            self._count(site, "hits" if row is not None else "misses")
+            self._lookups += 1
+            if self._lookups % FLUSH_EVERY == 0:
+                self._flush()
+        return row[0] if row is not None else None
+
+    def put(self, key: str, site: str, response: str, ttl: float = LLM_CACHE_TTL):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "insert or replace into responses (key, site, response, created_at, expires_at, last_used) "
+                "values (?, ?, ?, ?, ?, ?)",
+                (key, site, response, now, now + ttl, now)
+            )
+            self._touched.pop(key, None)
+            self._flush()
+            self.stats.setdefault(site, {"hits": 0, "misses": 0, "stores": 0})["stores"] += 1
+            count = self._conn.execute("select count(*) from responses").fetchone()[0]
+            if count > self.max_entries:
+                self._prune(now)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._flush()
+            entries = self._conn.execute("select count(*) from responses").fetchone()[0]
+            totals = self._conn.execute("select site, hits, misses from site_stats").fetchall()
+        sites = {}
+        for site, hits, misses in totals:
+            sites[site] = {
+                "hits_all_services": hits,
+                "misses_all_services": misses,
+                "hit_rate_all_services": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            }
+        for site, counts in self.stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            sites.setdefault(site, {}).update({
+                **counts,
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            })
+        return {"path": self.path, "entries": entries, "max_entries": self.max_entries, "sites": sites}
+
+    def _count(self, site: str, outcome: str):
+        self.stats.setdefault(site, {"hits": 0, "misses": 0, "stores": 0})[outcome] += 1
+        self._pending_counts.setdefault(site, {"hits": 0, "misses": 0})[outcome] += 1
+
+    def _flush(self):
+        """
+        Writes buffered last_used times and hit/miss counts in one transaction.
+        """
+        if not self._touched and not self._pending_counts:
+            return
+        touched = [(used, key) for key, used in self._touched.items()]
+        counts = [(site, c["hits"], c["misses"]) for site, c in self._pending_counts.items()]
+        self._touched = {}
+        self._pending_counts = {}
+        with self._conn:
+            self._conn.execute("begin")
+            self._conn.executemany(
+                "update responses set last_used = max(last_used, ?) where key = ?", touched
+            )
+            self._conn.executemany(
+                "insert into site_stats (site, hits, misses) values (?, ?, ?) "
+                "on conflict(site) do update set hits = hits + excluded.hits, misses = misses + excluded.misses",
+                counts
+            )
+
+    def _prune(self, now: float):
+        self._conn.execute("delete from responses where expires_at <= ?", (now,))
+        count = self._conn.execute("select count(*) from responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "delete from responses where key in (select key from responses order by last_used limit ?)",
+                (count - self.max_entries,)
+            )
+
+
+llm_cache = LLMCache()
+atexit.register(llm_cache.flush)  # Keep the last batch of counters and last_used times
+
+
+async def cached_llm_call_async(site: str, model_name: str, prompt: str, call, ttl: float = LLM_CACHE_TTL,
+                                inputs=None, should_store=None) -> str:
+    """
+    Returns the cached text for this prompt, or awaits `call()` (returning text) and caches it.
+    `should_store(text)` can veto caching, e.g. for unparseable JSON.
+    """
+    # SQLite waits up to 5s on a busy writer in another service, so stay off the event loop
+    key = llm_cache.make_key(model_name, prompt, inputs)
+    text = await asyncio.to_thread(llm_cache.get, key, site)
+    if text is None:
+        text = await call()
+        if should_store is None or should_store(text):
+            await asyncio.to_thread(llm_cache.put, key, site, text, ttl)
+    return text
@@ -1,10 +1,26 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from agents import run_sentinel_agent, run_web_scout_agent
-from tools import supabase, get_weather_data, calculate_risk_score, predict_disease_risk, analyze_symptoms, get_hospital_stats, get_citizen_reports, get_health_remedies, analyze_report_credibility, scout_web_for_symptoms
+from agents import run_sentinel_agent, run_web_scout_agent, keep_web_scout_warm, scout_cache, web_scout_pool
+from weather_grid import WeatherGrid
+from llm_cache import llm_cache
+from spatial_index import load_ward_index
+from reports import EXPORT_COLUMNS, MAP_COLUMNS, PENDING_COLUMNS, ReportColumns, parse_timestamp
+from gazetteer import location_key
+from disease_rules import disease_rules
+from metrics import LatencyHistogram, monitor_event_loop
+from db import run_query, run_call, db_snapshot
+from tools import supabase, weather_cache, get_http_client, close_http_client, get_weather_data, get_weather_data_bulk, calculate_risk_score, calculate_risk_scores, risk_statuses, weather_columns, predict_disease_risk, get_hospital_stats, iter_citizen_reports, summarize_citizen_reports, count_citizen_reports_by_ward, get_health_remedies, analyze_report_credibility, scout_web_for_symptoms
 import os
+import asyncio
+import csv
+import io
+import json
+import time
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,6 +36,79 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Risk Zones (Comprehensive Mumbai Areas) used by the Official Dashboard
+RISK_ZONES = [
+    {"name": "Colaba", "base": 4.5, "variance": 2.0, "lat": 18.9067, "lng": 72.8147},
+    {"name": "Fort", "base": 3.8, "variance": 2.0, "lat": 18.9322, "lng": 72.8328},
+    {"name": "Marine Lines", "base": 3.5, "variance": 1.5, "lat": 18.9447, "lng": 72.8244},
+    {"name": "Malabar Hill", "base": 2.2, "variance": 1.0, "lat": 18.9548, "lng": 72.7985},
+    {"name": "Worli", "base": 5.1, "variance": 3.0, "lat": 19.0166, "lng": 72.8172},
+    {"name": "Dadar", "base": 4.0, "variance": 2.5, "lat": 19.0178, "lng": 72.8478},
+    {"name": "Bandra West", "base": 2.5, "variance": 1.5, "lat": 19.0596, "lng": 72.8295},
+    {"name": "Bandra East", "base": 4.5, "variance": 2.0, "lat": 19.0625, "lng": 72.8437},
+    {"name": "Santacruz", "base": 5.0, "variance": 2.5, "lat": 19.0843, "lng": 72.8360},
+    {"name": "Andheri East", "base": 6.5, "variance": 3.5, "lat": 19.1136, "lng": 72.8697},
+    {"name": "Andheri West", "base": 5.5, "variance": 3.0, "lat": 19.1197, "lng": 72.8305},
+    {"name": "Juhu", "base": 3.8, "variance": 1.5, "lat": 19.1075, "lng": 72.8263},
+    {"name": "Goregaon", "base": 5.5, "variance": 2.5, "lat": 19.1663, "lng": 72.8526},
+    {"name": "Malad", "base": 5.8, "variance": 2.8, "lat": 19.1874, "lng": 72.8484},
+    {"name": "Kandivali", "base": 4.4, "variance": 2.0, "lat": 19.2047, "lng": 72.8520},
+    {"name": "Borivali", "base": 3.5, "variance": 1.5, "lat": 19.2307, "lng": 72.8567},
+    {"name": "Dahisar", "base": 3.2, "variance": 1.2, "lat": 19.2575, "lng": 72.8591},
+    {"name": "Kurla", "base": 6.0, "variance": 4.0, "lat": 19.0726, "lng": 72.8793},
+    {"name": "Ghatkopar", "base": 5.6, "variance": 3.0, "lat": 19.0860, "lng": 72.9090},
+    {"name": "Vikhroli", "base": 4.5, "variance": 2.5, "lat": 19.1119, "lng": 72.9278},
+    {"name": "Powai", "base": 5.8, "variance": 3.0, "lat": 19.1197, "lng": 72.9051},
+    {"name": "Mulund", "base": 3.8, "variance": 1.8, "lat": 19.1726, "lng": 72.9425},
+    {"name": "Chembur", "base": 4.5, "variance": 2.0, "lat": 19.0522, "lng": 72.8999},
+    {"name": "Sion", "base": 6.2, "variance": 3.8, "lat": 19.0390, "lng": 72.8619},
+]
+
+# BMC Wards (Mocked for Hackathon, mapped to Areas)
+BMC_WARDS = [
+    {"id": "A", "name": "Colaba", "lat": 18.9067, "lng": 72.8147},
+    {"id": "D", "name": "Malabar Hill", "lat": 18.9548, "lng": 72.7985},
+    {"id": "G/N", "name": "Dadar", "lat": 19.0178, "lng": 72.8478},
+    {"id": "H/W", "name": "Bandra West", "lat": 19.0596, "lng": 72.8295},
+    {"id": "K/E", "name": "Andheri East", "lat": 19.1136, "lng": 72.8697},
+    {"id": "K/W", "name": "Andheri West", "lat": 19.1197, "lng": 72.8305},
+    {"id": "L", "name": "Kurla", "lat": 19.0726, "lng": 72.8793},
+    {"id": "S", "name": "Powai", "lat": 19.1197, "lng": 72.9051},
+    {"id": "F/N", "name": "Sion", "lat": 19.0390, "lng": 72.8619}
+]
+
+# Weather lattice covering every dashboard zone and BMC ward, for arbitrary GPS lookups
+weather_grid = WeatherGrid.around([(z["lat"], z["lng"]) for z in RISK_ZONES + BMC_WARDS])
+
+# Local lat/lon -> ward index, loaded from the wards table at startup
+ward_index = None
+
+async def load_wards():
+    global ward_index
+    try:
+        ward_index = await run_call(load_ward_index, supabase, name="wards.index")
+    except Exception as e:
+        print(f"⚠️ Could not load ward index: {e}")
+
+background_tasks = []
+loop_lag = LatencyHistogram()  # Should stay flat under load now that DB calls run off the loop
+
+@app.on_event("startup")
+async def startup():
+    # One keep-alive connection pool for all upstream calls made by tools.py
+    get_http_client()
+    background_tasks.append(asyncio.create_task(monitor_event_loop(loop_lag)))
+    background_tasks.append(asyncio.create_task(load_wards()))
+    background_tasks.append(asyncio.create_task(weather_grid.run()))
+    background_tasks.append(asyncio.create_task(keep_web_scout_warm()))
+    background_tasks.append(asyncio.create_task(materialize_dashboard()))
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in background_tasks:
+        task.cancel()
+    await close_http_client()
+
 class ChatRequest(BaseModel):
     location: str
 
@@ -39,6 +128,8 @@ async def chat_endpoint(request: ChatRequest):
     """
     try:
         result = await run_sentinel_agent(request.location)
+        if result.get("status") == "PAUSED":
+            mark_dashboard_dirty()  # A new dispatch ticket changes active_alerts
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -52,10 +143,13 @@ async def resume_dispatch(action: DispatchAction):
         # Update ticket status
         status = "approved" if action.action == "approve" else "rejected"
         
-        data = supabase.table("dispatch_tickets")\
-            .update({"status": status, "approved_at": "now()"})\
-            .eq("id", action.ticket_id)\
-            .execute()
+        data = await run_query(
+            supabase.table("dispatch_tickets")
+            .update({"status": status, "approved_at": "now()"})
+            .eq("id", action.ticket_id),
+            "dispatch_tickets.update_status"
+        )
+        mark_dashboard_dirty()
             
         if action.action == "approve":
             # TODO: Trigger actual alert dispatch (e.g., Telegram broadcast)
@@ -76,118 +170,165 @@ async def telegram_redirect(reportId: str = None):
         telegram_bot_url += f"?start={reportId}"
     return RedirectResponse(url=telegram_bot_url)
 
+# Dashboard Snapshot Config
+# The dashboard payload is rebuilt in the background every DASHBOARD_REFRESH_SECONDS,
+# or sooner when reports/tickets change, and requests just return the latest snapshot.
+DASHBOARD_REFRESH_SECONDS = float(os.environ.get("DASHBOARD_REFRESH_SECONDS", 60))
+DASHBOARD_MIN_REBUILD_SECONDS = float(os.environ.get("DASHBOARD_MIN_REBUILD_SECONDS", 2))
+DASHBOARD_COLD_WAIT_SECONDS = float(os.environ.get("DASHBOARD_COLD_WAIT_SECONDS", 30))
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """
+    Immutable, pre-serialized Official Dashboard payload.
+    """
+    body: bytes
+    built_at: float
+    build_seconds: float
+
+dashboard_snapshot: DashboardSnapshot = None
+dashboard_stats = {"builds": 0, "errors": 0, "served": 0}
+_dashboard_dirty = asyncio.Event()
+_dashboard_ready = asyncio.Event()
+
+def mark_dashboard_dirty():
+    """
+    Asks the materializer to rebuild the dashboard snapshot soon.
+    """
+    _dashboard_dirty.set()
+
+async def build_dashboard_stats() -> dict:
+    """
+    Computes aggregated stats for the Official Dashboard. Raises on failure.
+    """
+    # 1. System Health
+    system_health = "Operational"
+    
+    # 2. Total Reports & Active Alerts
+    # Count and symptoms are accumulated page by page, the reports themselves are never held
+    report_summary = await summarize_citizen_reports()
+    
+    # [NEW] Web Scout Integration (Google ADK Agent)
+    # Fetch real-time web signals for Mumbai using Gemini Grounding
+    web_signals = await run_web_scout_agent("Mumbai")
+    
+    # Merge Citizen Reports + Web Signals for Analysis
+    symptom_counter = report_summary["symptoms"]
+    symptom_counter.add_reports(web_signals)
+    
+    reports_count = report_summary["reports"] # Only count official DB reports for the counter
+    
+    pending_tickets = (await run_query(
+        supabase.table("dispatch_tickets").select("*", count="exact").eq("status", "pending"),
+        "dispatch_tickets.pending_count"
+    )).count
+    
+    # 3. Weather & Risk Analysis (Real-time for Mumbai)
+    # All zones in one batched fetch; Andheri East doubles as the Mumbai proxy
+    zone_weather = await get_weather_data_bulk([(zone["lat"], zone["lng"]) for zone in RISK_ZONES])
+    weather_data = await get_weather_data(19.1136, 72.8697)  # Cache hit after the batch above
+    current_weather = weather_data.get("current", {})
+    
+    # Analyze Symptoms from ALL sources (DB + Web)
+    trending_symptoms = symptom_counter.top(3)
+    
+    # Predict Disease Risk
+    disease_forecast = predict_disease_risk(weather_data, trending_symptoms)
+    
+    # Risk Breakdown
+    risk_breakdown = {
+        "rain_score": 3.0 if current_weather.get("rain", 0) > 5 else 1.0,
+        "humidity_score": 2.0 if current_weather.get("relative_humidity_2m", 0) > 80 else 1.0,
+        "social_score": min(reports_count * 0.5, 4.0)
+    }
+
+    # 4. Risk Zones (Comprehensive Mumbai Areas) - Dynamic with realistic variations
+    import random
+    random.seed(int(time.time() / 60))  # Changes every minute
+    
+    # Apply realistic variations, then bucket all zones in one pass
+    zone_scores = []
+    for zone in RISK_ZONES:
+        variation = random.uniform(-zone["variance"]/2, zone["variance"])
+        zone_scores.append(round(min(max(zone["base"] + variation, 1.0), 10.0), 1))
+    zone_statuses = risk_statuses(zone_scores)
+    
+    risk_zones_dynamic = []
+    for zone, weather, risk_score, status in zip(RISK_ZONES, zone_weather, zone_scores, zone_statuses):
+        risk_zones_dynamic.append({
+            "name": zone["name"],
+            "risk_score": risk_score,
+            "lat": zone["lat"],
+            "lng": zone["lng"],
+            "status": str(status),
+            "weather": {
+                "rain": weather.get("current", {}).get("rain", 0),
+                "humidity": weather.get("current", {}).get("relative_humidity_2m", 0)
+            }
+        })
+    
+    return {
+        "system_health": system_health,
+        "total_reports": reports_count,
+        "active_alerts": pending_tickets,
+        "risk_zones": risk_zones_dynamic,
+        "weather_details": {
+            "rain": current_weather.get("rain", 0),
+            "humidity": current_weather.get("relative_humidity_2m", 0),
+            "temp": current_weather.get("temperature_2m", 0)
+        },
+        "risk_breakdown": risk_breakdown,
+        "disease_forecast": disease_forecast,
+        "symptom_trends": trending_symptoms
+    }
+
+async def refresh_dashboard_snapshot():
+    global dashboard_snapshot
+    started = time.monotonic()
+    payload = await build_dashboard_stats()
+    built_at = time.time()
+    payload["snapshot_built_at"] = datetime.fromtimestamp(built_at, timezone.utc).isoformat()
+    dashboard_snapshot = DashboardSnapshot(
+        body=json.dumps(payload).encode(),
+        built_at=built_at,
+        build_seconds=time.monotonic() - started
+    )
+    dashboard_stats["builds"] += 1
+
+async def materialize_dashboard(interval: float = DASHBOARD_REFRESH_SECONDS):
+    """
+    Background job: rebuilds the dashboard snapshot on a schedule or on data change.
+    A failed build keeps serving the previous snapshot.
+    """
+    while True:
+        _dashboard_dirty.clear()
+        try:
+            await refresh_dashboard_snapshot()
+        except Exception as e:
+            dashboard_stats["errors"] += 1
+            print(f"Error fetching stats: {e}")
+        _dashboard_ready.set()
+        
+        try:
+            await asyncio.wait_for(_dashboard_dirty.wait(), timeout=interval)
+            await asyncio.sleep(DASHBOARD_MIN_REBUILD_SECONDS)  # Coalesce bursts of writes
+        except asyncio.TimeoutError:
+            pass
+
 @app.get("/api/dashboard/stats")
 async def get_dashboard_stats():
     """
-    Returns aggregated stats for the Official Dashboard.
+    Returns aggregated stats for the Official Dashboard from the latest snapshot.
     """
-    try:
-        # 1. System Health
-        system_health = "Operational"
-        
-        # 2. Total Reports & Active Alerts
-        reports_response = supabase.table("citizen_reports").select("*").execute()
-        reports = reports_response.data
-        
-        # [NEW] Web Scout Integration (Google ADK Agent)
-        # Fetch real-time web signals for Mumbai using Gemini Grounding
-        web_signals = await run_web_scout_agent("Mumbai")
-        
-        # Merge Citizen Reports + Web Signals for Analysis
-        all_reports_for_analysis = reports + web_signals
-        
-        reports_count = len(reports) # Only count official DB reports for the counter
-        
-        pending_tickets = supabase.table("dispatch_tickets").select("*", count="exact").eq("status", "pending").execute().count
-        
-        # 3. Weather & Risk Analysis (Real-time for Mumbai)
-        # Using Andheri coords as proxy for Mumbai
-        weather_data = await get_weather_data(19.1136, 72.8697)
-        current_weather = weather_data.get("current", {})
-        
-        # Analyze Symptoms from ALL sources (DB + Web)
-        trending_symptoms = analyze_symptoms(all_reports_for_analysis)
-        
-        # Predict Disease Risk
-        disease_forecast = predict_disease_risk(weather_data, trending_symptoms)
-        
-        # Risk Breakdown
-        risk_breakdown = {
-            "rain_score": 3.0 if current_weather.get("rain", 0) > 5 else 1.0,
-            "humidity_score": 2.0 if current_weather.get("relative_humidity_2m", 0) > 80 else 1.0,
-            "social_score": min(reports_count * 0.5, 4.0)
-        }
-
-        # 4. Risk Zones (Comprehensive Mumbai Areas) - Dynamic with realistic variations
-        import random
-        import time
-        random.seed(int(time.time() / 60))  # Changes every minute
-        
-        risk_zones = [
-            {"name": "Colaba", "base": 4.5, "variance": 2.0, "lat": 18.9067, "lng": 72.8147},
-            {"name": "Fort", "base": 3.8, "variance": 2.0, "lat": 18.9322, "lng": 72.8328},
-            {"name": "Marine Lines", "base": 3.5, "variance": 1.5, "lat": 18.9447, "lng": 72.8244},
-            {"name": "Malabar Hill", "base": 2.2, "variance": 1.0, "lat": 18.9548, "lng": 72.7985},
-            {"name": "Worli", "base": 5.1, "variance": 3.0, "lat": 19.0166, "lng": 72.8172},
-            {"name": "Dadar", "base": 4.0, "variance": 2.5, "lat": 19.0178, "lng": 72.8478},
-            {"name": "Bandra West", "base": 2.5, "variance": 1.5, "lat": 19.0596, "lng": 72.8295},
-            {"name": "Bandra East", "base": 4.5, "variance": 2.0, "lat": 19.0625, "lng": 72.8437},
-            {"name": "Santacruz", "base": 5.0, "variance": 2.5, "lat": 19.0843, "lng": 72.8360},
-            {"name": "Andheri East", "base": 6.5, "variance": 3.5, "lat": 19.1136, "lng": 72.8697},
-            {"name": "Andheri West", "base": 5.5, "variance": 3.0, "lat": 19.1197, "lng": 72.8305},
-            {"name": "Juhu", "base": 3.8, "variance": 1.5, "lat": 19.1075, "lng": 72.8263},
-            {"name": "Goregaon", "base": 5.5, "variance": 2.5, "lat": 19.1663, "lng": 72.8526},
-            {"name": "Malad", "base": 5.8, "variance": 2.8, "lat": 19.1874, "lng": 72.8484},
-            {"name": "Kandivali", "base": 4.4, "variance": 2.0, "lat": 19.2047, "lng": 72.8520},
-            {"name": "Borivali", "base": 3.5, "variance": 1.5, "lat": 19.2307, "lng": 72.8567},
-            {"name": "Dahisar", "base": 3.2, "variance": 1.2, "lat": 19.2575, "lng": 72.8591},
-            {"name": "Kurla", "base": 6.0, "variance": 4.0, "lat": 19.0726, "lng": 72.8793},
-            {"name": "Ghatkopar", "base": 5.6, "variance": 3.0, "lat": 19.0860, "lng": 72.9090},
-            {"name": "Vikhroli", "base": 4.5, "variance": 2.5, "lat": 19.1119, "lng": 72.9278},
-            {"name": "Powai", "base": 5.8, "variance": 3.0, "lat": 19.1197, "lng": 72.9051},
-            {"name": "Mulund", "base": 3.8, "variance": 1.8, "lat": 19.1726, "lng": 72.9425},
-            {"name": "Chembur", "base": 4.5, "variance": 2.0, "lat": 19.0522, "lng": 72.8999},
-            {"name": "Sion", "base": 6.2, "variance": 3.8, "lat": 19.0390, "lng": 72.8619},
-        ]
-        
-        # Apply realistic variations and determine status
-        risk_zones_dynamic = []
-        for zone in risk_zones:
-            variation = random.uniform(-zone["variance"]/2, zone["variance"])
-            risk_score = round(min(max(zone["base"] + variation, 1.0), 10.0), 1)
-            
-            status = "SAFE"
-            if risk_score >= 8.0:
-                status = "CRITICAL"
-            elif risk_score >= 6.0:
-                status = "HIGH"
-            elif risk_score >= 4.0:
-                status = "CAUTION"
-            
-            risk_zones_dynamic.append({
-                "name": zone["name"],
-                "risk_score": risk_score,
-                "lat": zone["lat"],
-                "lng": zone["lng"],
-                "status": status
-            })
-        
-        return {
-            "system_health": system_health,
-            "total_reports": reports_count,
-            "active_alerts": pending_tickets,
-            "risk_zones": risk_zones_dynamic,
-            "weather_details": {
-                "rain": current_weather.get("rain", 0),
-                "humidity": current_weather.get("relative_humidity_2m", 0),
-                "temp": current_weather.get("temperature_2m", 0)
-            },
-            "risk_breakdown": risk_breakdown,
-            "disease_forecast": disease_forecast,
-            "symptom_trends": trending_symptoms
-        }
-    except Exception as e:
-        print(f"Error fetching stats: {e}")
+    if dashboard_snapshot is None:
+        # Cold start: wait for the first build rather than building per request
+        try:
+            await asyncio.wait_for(_dashboard_ready.wait(), timeout=DASHBOARD_COLD_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    
+    snapshot = dashboard_snapshot
+    if snapshot is None:
         # Return fallback data if DB fails
         return {
             "system_health": "Degraded",
@@ -197,8 +338,12 @@ async def get_dashboard_stats():
             "weather_details": {},
             "risk_breakdown": {},
             "disease_forecast": [],
-            "symptom_trends": []
+            "symptom_trends": [],
+            "snapshot_built_at": None
         }
+    
+    dashboard_stats["served"] += 1
+    return Response(content=snapshot.body, media_type="application/json")
 
 @app.post("/api/login")
 async def login(request: LoginRequest):
@@ -206,7 +351,10 @@ async def login(request: LoginRequest):
     Simple login for hospitals.
     """
     try:
-        response = supabase.table("hospitals").select("*").eq("username", request.username).eq("password", request.password).execute()
+        response = await run_query(
+            supabase.table("hospitals").select("*").eq("username", request.username).eq("password", request.password),
+            "hospitals.login"
+        )
         if len(response.data) > 0:
             return {"status": "success", "hospital": response.data[0]}
         else:
@@ -228,7 +376,7 @@ async def citizen_signup(request: Request):
         raise HTTPException(status_code=400, detail="Missing fields")
         
     # Check if user exists
-    existing = supabase.table("citizen_users").select("*").eq("phone", phone).execute()
+    existing = await run_query(supabase.table("citizen_users").select("*").eq("phone", phone), "citizen_users.by_phone")
     if existing.data:
         raise HTTPException(status_code=400, detail="User already exists")
         
@@ -238,7 +386,7 @@ async def citizen_signup(request: Request):
         "phone": phone,
         "password": password # Plaintext for hackathon
     }
-    response = supabase.table("citizen_users").insert(user_data).execute()
+    response = await run_query(supabase.table("citizen_users").insert(user_data), "citizen_users.insert")
     
     if response.data:
         return {"status": "success", "user": response.data[0]}
@@ -257,7 +405,10 @@ async def citizen_login(request: Request):
         raise HTTPException(status_code=400, detail="Missing credentials")
         
     # Verify credentials
-    response = supabase.table("citizen_users").select("*").eq("phone", phone).eq("password", password).execute()
+    response = await run_query(
+        supabase.table("citizen_users").select("*").eq("phone", phone).eq("password", password),
+        "citizen_users.login"
+    )
     
     if response.data:
         return {"status": "success", "user": response.data[0]}
@@ -280,8 +431,8 @@ async def citizen_stats(lat: float = None, lon: float = None, location: str = No
         if not location and lat:
              target_location = "Current Location"
 
-        # 2. Get Weather & AQI
-        weather_data = await get_weather_data(target_lat, target_lon)
+        # 2. Get Weather & AQI (interpolated from the grid, network only if it is cold)
+        weather_data = weather_grid.sample(target_lat, target_lon) or await get_weather_data(target_lat, target_lon)
         
         # 3. Get Web Signals (Web Scout)
         # Note: Web Scout needs a text location name to search news.
@@ -291,17 +442,18 @@ async def citizen_stats(lat: float = None, lon: float = None, location: str = No
         web_signals = await run_web_scout_agent(search_query_location)
         
         # 4. Aggregate Symptoms
-        citizen_reports = supabase.table("citizen_reports").select("*").ilike("location", f"%{search_query_location}%").execute().data
+        report_summary = await summarize_citizen_reports(search_query_location)
         
         web_reports = [{"description": s} for s in web_signals if isinstance(s, str)]
         if web_signals and isinstance(web_signals[0], dict):
              web_reports = web_signals
              
-        all_reports = citizen_reports + web_reports
-        trending_symptoms = analyze_symptoms(all_reports)
+        symptom_counter = report_summary["symptoms"]
+        symptom_counter.add_reports(web_reports)
+        trending_symptoms = symptom_counter.top(3)
         
         # 5. Calculate Risk Score
-        report_count = len(citizen_reports)
+        report_count = report_summary["reports"]
         risk_score = calculate_risk_score(weather_data, report_count)
         
         # 6. Predict Disease Outbreaks
@@ -342,19 +494,19 @@ async def hospital_stats(location: str):
         print(f"DEBUG: Weather Data for {location}: {weather_data}") # Debug print
         
         # [NEW] Aggregate Symptoms (Telegram + Web)
-        all_reports = get_citizen_reports(location)
-        verified_reports = [r for r in all_reports if r.get("verified")]
+        report_summary = await summarize_citizen_reports(location)
         
         # Convert web signals to report format for analysis
         web_reports = [{"description": s} for s in web_signals if isinstance(s, str)]
         if web_signals and isinstance(web_signals[0], dict):
              web_reports = web_signals
              
-        combined_reports = all_reports + web_reports
-        trending_symptoms = analyze_symptoms(combined_reports)
+        symptom_counter = report_summary["symptoms"]
+        symptom_counter.add_reports(web_reports)
+        trending_symptoms = symptom_counter.top(3)
         
         # Calculate Dynamic Risk Score
-        risk_score = calculate_risk_score(weather_data, len(all_reports), len(verified_reports))
+        risk_score = calculate_risk_score(weather_data, report_summary["reports"], report_summary["verified"])
         
         # Update local_stats with dynamic risk
         local_stats["risk_score"] = risk_score
@@ -382,37 +534,30 @@ async def bmc_stats():
     """
     try:
         import random
-        import time
         
         # Seed random with current minute for variation every minute
         random.seed(int(time.time() / 60))
         
-        # 1. Define Wards (Mocked for Hackathon, mapped to Areas)
-        wards = [
-            {"id": "A", "name": "Colaba", "lat": 18.9067, "lng": 72.8147},
-            {"id": "D", "name": "Malabar Hill", "lat": 18.9548, "lng": 72.7985},
-            {"id": "G/N", "name": "Dadar", "lat": 19.0178, "lng": 72.8478},
-            {"id": "H/W", "name": "Bandra West", "lat": 19.0596, "lng": 72.8295},
-            {"id": "K/E", "name": "Andheri East", "lat": 19.1136, "lng": 72.8697},
-            {"id": "K/W", "name": "Andheri West", "lat": 19.1197, "lng": 72.8305},
-            {"id": "L", "name": "Kurla", "lat": 19.0726, "lng": 72.8793},
-            {"id": "S", "name": "Powai", "lat": 19.1197, "lng": 72.9051},
-            {"id": "F/N", "name": "Sion", "lat": 19.0390, "lng": 72.8619}
-        ]
+        # Get Weather for all wards in one batched fetch
+        ward_weather = await get_weather_data_bulk([(ward["lat"], ward["lng"]) for ward in BMC_WARDS])
         
-        ward_stats = []
+        # Report counts for all wards in one paged scan, counted by ward name as pages arrive
+        ward_counts = await count_citizen_reports_by_ward([ward["name"] for ward in BMC_WARDS])
         
-        for ward in wards:
-            # Get Reports for Ward (from both citizen_reports and telegram reports)
-            reports = get_citizen_reports(ward["name"])
-            verified = [r for r in reports if r.get("verified")]
-            
-            # Get Weather (Mocked/Shared)
-            weather = await get_weather_data(ward["lat"], ward["lng"])
-            
-            # Calculate Base Risk
-            base_risk = calculate_risk_score(weather, len(reports), len(verified))
-            
+        # Base risk for every ward in one vectorized pass
+        report_counts = [ward_counts[ward["name"]]["reports"] for ward in BMC_WARDS]
+        verified_counts = [ward_counts[ward["name"]]["verified"] for ward in BMC_WARDS]
+        rain, humidity = weather_columns(ward_weather)
+        base_risks = calculate_risk_scores(rain, humidity, report_counts, verified_counts)
+        
+        # Disease forecast for every ward in one batched rules pass, from the ward's weather
+        # and its top reported symptoms (as the citizen and hospital forecasts do)
+        ward_symptoms = [ward_counts[ward["name"]]["symptoms"].top(3) for ward in BMC_WARDS]
+        ward_disease_risks = disease_rules.predict_many(ward_weather, ward_symptoms)
+        
+        ward_risks = []
+        ward_cases = []
+        for ward, report_count, base_risk in zip(BMC_WARDS, report_counts, base_risks):
             # Add realistic variation based on ward characteristics
             variation = 0.0
             
@@ -427,7 +572,7 @@ async def bmc_stats():
                 variation = random.uniform(1.0, 3.5)
             
             # Final risk score with realistic limits
-            risk = round(min(base_risk + variation, 10.0), 1)
+            risk = round(min(float(base_risk) + variation, 10.0), 1)
             
             # Generate realistic case counts based on risk
             cases = 0
@@ -441,30 +586,29 @@ async def bmc_stats():
                 cases = random.randint(0, 3)
             
             # Add actual reports to cases
-            cases += len(reports)
-            
-            # Determine Status & Action Plan
-            status = "SAFE"
-            action_plan = "Routine Monitoring"
-            
-            if risk >= 8.0:
-                status = "CRITICAL"
-                action_plan = "🚨 Deploy Fogging Trucks + Medical Camps"
-            elif risk >= 6.0:
-                status = "HIGH"
-                action_plan = "⚠️ Increase Surveillance + Anti-Larval Treatment"
-            elif risk >= 4.0:
-                status = "CAUTION"
-                action_plan = "📢 Public Awareness Campaign"
-                
+            ward_risks.append(risk)
+            ward_cases.append(cases + report_count)
+        
+        # Determine Status & Action Plan
+        action_plans = {
+            "CRITICAL": "🚨 Deploy Fogging Trucks + Medical Camps",
+            "HIGH": "⚠️ Increase Surveillance + Anti-Larval Treatment",
+            "CAUTION": "📢 Public Awareness Campaign",
+            "SAFE": "Routine Monitoring"
+        }
+        ward_stats = []
+        for ward, risk, cases, verified, status, disease_risks in zip(
+            BMC_WARDS, ward_risks, ward_cases, verified_counts, risk_statuses(ward_risks), ward_disease_risks
+        ):
             ward_stats.append({
                 "ward_id": ward["id"],
                 "name": ward["name"],
                 "risk_score": risk,
                 "total_cases": cases,
-                "verified_cases": len(verified),
-                "status": status,
-                "action_plan": action_plan,
+                "verified_cases": verified,
+                "status": str(status),
+                "action_plan": action_plans[str(status)],
+                "disease_risks": disease_risks,
                 "lat": ward["lat"],
                 "lng": ward["lng"]
             })
@@ -474,7 +618,7 @@ async def bmc_stats():
             
         return {
             "system_status": "Active",
-            "total_wards": len(wards),
+            "total_wards": len(BMC_WARDS),
             "critical_wards": len([w for w in ward_stats if w["status"] == "CRITICAL"]),
             "ward_details": ward_stats
         }
@@ -498,12 +642,14 @@ async def citizen_report(request: Request):
         
     report_data = {
         "location": location,
+        "location_key": location_key(location),  # Canonical area, see gazetteer.py
         "description": description,
         "verified": False
         # "user_id": user_id # If we linked to profiles
     }
     
-    response = supabase.table("citizen_reports").insert(report_data).execute()
+    response = await run_query(supabase.table("citizen_reports").insert(report_data), "citizen_reports.insert")
+    mark_dashboard_dirty()
     return {"status": "success", "report": response.data[0]}
 
 @app.get("/api/reports/pending")
@@ -512,7 +658,10 @@ async def get_pending_reports():
     Returns unverified reports with AI credibility analysis.
     """
     # Fetch pending reports
-    reports = supabase.table("citizen_reports").select("*").eq("verified", False).execute().data
+    reports = (await run_query(
+        supabase.table("citizen_reports").select(PENDING_COLUMNS).eq("verified", False),
+        "citizen_reports.pending"
+    )).data
     
     results = []
     for report in reports:
@@ -533,6 +682,36 @@ async def get_pending_reports():
         
     return results
 
+@app.get("/api/reports/export")
+async def export_reports(since: str = None, until: str = None, verified_only: bool = False):
+    """
+    Streams citizen reports as CSV, oldest first, optionally within [since, until) (ISO timestamps).
+    Reports are fetched and written one page at a time, so any table size exports in bounded memory.
+    """
+    try:
+        since = parse_timestamp(since) if since else None
+        until = parse_timestamp(until) if until else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be ISO 8601 timestamps")
+    
+    async def csv_pages():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+        async for page in iter_citizen_reports(", ".join(EXPORT_COLUMNS), verified_only=verified_only,
+                                               since=since, until=until, name="citizen_reports.export"):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([report.get(column) for column in EXPORT_COLUMNS] for report in page)
+            yield buffer.getvalue()
+    
+    return StreamingResponse(
+        csv_pages(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="citizen_reports.csv"'}
+    )
+
 @app.post("/api/reports/verify")
 async def verify_report(request: Request):
     """
@@ -543,10 +722,12 @@ async def verify_report(request: Request):
     action = data.get("action") # 'approve' or 'reject'
     
     if action == 'approve':
-        supabase.table("citizen_reports").update({"verified": True}).eq("id", report_id).execute()
+        await run_query(supabase.table("citizen_reports").update({"verified": True}).eq("id", report_id), "citizen_reports.verify")
+        mark_dashboard_dirty()
         return {"status": "approved"}
     elif action == 'reject':
-        supabase.table("citizen_reports").delete().eq("id", report_id).execute()
+        await run_query(supabase.table("citizen_reports").delete().eq("id", report_id), "citizen_reports.delete")
+        mark_dashboard_dirty()
         return {"status": "rejected"}
         
     return {"status": "error"}
@@ -582,11 +763,13 @@ async def get_alerts(limit: int = 10):
     Returns recent alerts generated by brain.py
     """
     try:
-        response = supabase.table("alerts")\
-            .select("*, wards(name)")\
-            .order("created_at", desc=True)\
-            .limit(limit)\
-            .execute()
+        response = await run_query(
+            supabase.table("alerts")
+            .select("*, wards(name)")
+            .order("created_at", desc=True)
+            .limit(limit),
+            "alerts.recent"
+        )
         return {"alerts": response.data}
     except Exception as e:
         print(f"Error fetching alerts: {e}")
@@ -599,35 +782,62 @@ async def get_map_reports():
     """
     try:
         # Get reports from telegram bot (with geometry locations)
-        reports_response = supabase.table("reports")\
-            .select("*, wards(name)")\
-            .limit(50)\
-            .execute()
+        reports_response = await run_query(
+            supabase.table("reports")
+            .select(MAP_COLUMNS)
+            .limit(50),
+            "reports.map"
+        )
+        rows = reports_response.data
+        # location comes back as WKT, EWKB hex or GeoJSON depending on the client; parsed once into lat/lon arrays
+        columns = ReportColumns.from_rows(rows, descriptions=True)
+        nearest = ward_index.lookup_many(columns.lat, columns.lon) if ward_index else None
         
         map_markers = []
-        for report in reports_response.data:
-            # Convert PostGIS POINT to lat/lng
-            if report.get("location"):
-                # Location format: POINT(lon lat)
-                loc_str = report["location"]
-                if "POINT" in loc_str:
-                    coords = loc_str.replace("POINT(", "").replace(")", "").split()
-                    if len(coords) == 2:
-                        map_markers.append({
-                            "id": report["id"],
-                            "lat": float(coords[1]),
-                            "lng": float(coords[0]),
-                            "type": report.get("type", "Unknown"),
-                            "severity": report.get("severity", 5),
-                            "description": report.get("description", ""),
-                            "ward": report.get("wards", {}).get("name", "Unknown") if report.get("wards") else "Unknown"
-                        })
+        for i in np.flatnonzero(columns.has_point()).tolist():
+            ward = rows[i].get("wards")
+            if ward:
+                ward_name = ward.get("name", "Unknown")
+            elif nearest is not None and nearest[i] >= 0:
+                ward_name = ward_index.wards[nearest[i]]["name"]
+            else:
+                ward_name = "Unknown"
+            map_markers.append({
+                "id": columns.ids[i],
+                "lat": float(columns.lat[i]),
+                "lng": float(columns.lon[i]),
+                "type": columns.type_name(i),
+                "severity": int(columns.severity[i]),
+                "description": columns.descriptions[i],
+                "ward": ward_name
+            })
         
         return {"reports": map_markers}
     except Exception as e:
         print(f"Error fetching map reports: {e}")
         return {"reports": []}
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Returns cache and background job counters used to tune TTLs and refresh intervals.
+    """
+    return {
+        "weather_cache": weather_cache.snapshot(),
+        "weather_grid": weather_grid.snapshot(),
+        "web_scout_cache": scout_cache.snapshot(),
+        "web_scout_pool": web_scout_pool.snapshot(),
+        "llm_cache": llm_cache.snapshot(),
+        "ward_index": ward_index.snapshot() if ward_index else None,
+        "db": db_snapshot(),
+        "event_loop_lag": loop_lag.snapshot(),
+        "dashboard_snapshot": {
+            **dashboard_stats,
+            "age_seconds": round(time.time() - dashboard_snapshot.built_at, 1) if dashboard_snapshot else None,
+            "build_seconds": round(dashboard_snapshot.build_seconds, 3) if dashboard_snapshot else None
+        }
+    }
+
 @app.get("/")
 def health_check():
     return {"status": "SentinelHealthCast Brain is Active"}
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds; anything slower lands in the overflow bucket
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram, cheap enough to record on every call.
+    Quantiles are reported as the upper bound of the bucket they fall in.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b:g}s" for b in self.buckets] + [f">{self.buckets[-1]:g}s"]
+        return {
+            "count": self.count,
+            "avg_seconds": round(self.total / self.count, 4) if self.count else 0.0,
+            "max_seconds": round(self.max, 4),
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class StageTimer:
+    """
+    One LatencyHistogram per named stage.
+
+        with timer.time("vision"):
+            ...
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def observe(self, stage: str, seconds: float):
+        if stage not in self.stages:
+            self.stages[stage] = LatencyHistogram()
+        self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        return {stage: hist.snapshot() for stage, hist in self.stages.items()}
+
+
+async def monitor_event_loop(histogram: LatencyHistogram, interval: float = 0.5):
+    """
+    Background job: records event-loop lag (how late a sleep wakes up) until cancelled.
+    Anything blocking the loop shows up here as lag.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, loop.time() - started - interval))
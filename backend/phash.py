@@ -0,0 +1,135 @@
+import io
+import os
+import time
+from collections import deque
+from PIL import Image
+
+# Perceptual Dedup Config
+# dHash distance <= 6 of 64 bits survives re-compression, resizing and forwarding
+# screenshots of the same photo, while distinct scenes are typically 20+ bits apart.
+PHASH_MAX_DISTANCE = int(os.environ.get("PHASH_MAX_DISTANCE", 6))
+PHASH_TTL_HOURS = float(os.environ.get("PHASH_TTL_HOURS", 48))
+PHASH_MAX_ENTRIES = int(os.environ.get("PHASH_MAX_ENTRIES", 20000))
+
+HASH_BITS = 64
+BANDS = 8  # 8 bands of 8 bits: any two hashes within 7 bits share at least one band exactly
+
+
+def dhash(data: bytes, size: int = 8) -> int:
+    """
+    64-bit difference hash: shrink to (size+1) x size grayscale and record whether
+    each pixel is brighter than its right-hand neighbour.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("L", (size * 8, size * 8))  # Lets JPEG decode at 1/8 scale, far cheaper than full res
+        small = image.convert("L").resize((size + 1, size), Image.BILINEAR)
+        pixels = list(small.getdata())
+
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class PerceptualIndex:
+    """
+    Recently analyzed images keyed by dHash, with near-duplicate lookup.
+
+    Each hash is split into BANDS bands and filed under every (band, value) pair, so a
+    lookup only compares against hashes that match exactly in at least one band instead
+    of scanning the whole index. By the pigeonhole principle this finds every entry
+    within BANDS - 1 bits. Entries expire after `ttl_hours`, oldest first.
+    """
+
+    def __init__(self, max_distance: int = PHASH_MAX_DISTANCE, ttl_hours: float = PHASH_TTL_HOURS,
+                 max_entries: int = PHASH_MAX_ENTRIES):
+        if max_distance >= BANDS:
+            raise ValueError(f"max_distance must be below {BANDS} for banded lookup")
+        self.max_distance = max_distance
+        self.ttl = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.entries = {}     # hash -> {"analysis", "report_id", "added_at", "hits"}
+        self.order = deque()  # (added_at, hash), oldest first
+        self.bands = [dict() for _ in range(BANDS)]  # band value -> set of hashes
+        self.stats = {"lookups": 0, "duplicates": 0, "adds": 0, "expired": 0}
+
+    @staticmethod
+    def _band_values(value: int):
+        width = HASH_BITS // BANDS
+        mask = (1 << width) - 1
+        return [(value >> (i * width)) & mask for i in range(BANDS)]
+
+    def find(self, value: int):
+        """
+        Returns (hash, entry) of the closest indexed image within max_distance, or None.
+        """
+        self._expire(time.time())
+        self.stats["lookups"] += 1
+
+        best = None
+        best_distance = self.max_distance + 1
+        seen = set()
+        for band, band_value in zip(self.bands, self._band_values(value)):
+            for candidate in band.get(band_value, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = hamming(value, candidate)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+
+        if best is None:
+            return None
+        self.stats["duplicates"] += 1
+        entry = self.entries[best]
+        entry["hits"] += 1
+        return best, entry
+
+    def add(self, value: int, analysis: dict):
+        now = time.time()
+        if value in self.entries:
+            self.entries[value]["analysis"] = analysis
+            return
+        self.entries[value] = {"analysis": analysis, "report_id": None, "added_at": now, "hits": 0}
+        self.order.append((now, value))
+        for band, band_value in zip(self.bands, self._band_values(value)):
+            band.setdefault(band_value, set()).add(value)
+        self.stats["adds"] += 1
+        self._expire(now)
+
+    def link(self, value: int, report_id: str):
+        """
+        Records the report filed for an indexed image, so later duplicates can point at it.
+        """
+        entry = self.entries.get(value)
+        if entry is not None and entry["report_id"] is None:
+            entry["report_id"] = report_id
+
+    def report_id(self, value: int):
+        """
+        Returns the report filed for an indexed image, or None if it has none (yet).
+        """
+        entry = self.entries.get(value)
+        return entry["report_id"] if entry is not None else None
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "entries": len(self.entries), "max_distance": self.max_distance}
+
+    def _expire(self, now: float):
+        cutoff = now - self.ttl
+        while self.order and (self.order[0][0] < cutoff or len(self.order) > self.max_entries):
+            _, value = self.order.popleft()
+            self.entries.pop(value, None)
+            for band, band_value in zip(self.bands, self._band_values(value)):
+                bucket = band.get(band_value)
+                if bucket is not None:
+                    bucket.discard(value)
+                    if not bucket:
+                        del band[band_value]
+            self.stats["expired"] += 1
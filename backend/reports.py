@@ -0,0 +1,128 @@
+"""
+Compact report representations for the aggregation paths.
+
+PostgREST rows are dicts with one string per column; at 100k rows the dict and key
+overhead dominates. Aggregation code fetches only the columns it reads (the *_COLUMNS
+projections below) and keeps them as either:
+
+- Report: a __slots__ record, for the brain's sliding window where reports arrive
+  and expire one at a time.
+- ReportColumns: parallel NumPy arrays (ward code, severity, type code, lat, lon)
+  for the map endpoint, which resolves unplaced reports in one lookup_many call.
+"""
+import sys
+from datetime import datetime
+import numpy as np
+from spatial_index import parse_point
+
+# Column Projections
+BRAIN_COLUMNS = {
+    "reports": "id, ward_id, severity, type, location, created_at, duplicate_of",
+    "citizen_reports": "id, ward_id, created_at",  # Fallback table has no severity/type/location
+}
+MAP_COLUMNS = "id, ward_id, severity, type, description, location, wards(name)"
+PENDING_COLUMNS = "id, location, description, image_url, created_at"
+EXPORT_COLUMNS = ["id", "created_at", "location", "location_key", "ward_id", "description", "verified"]
+
+DEFAULT_SEVERITY = 5
+DEFAULT_TYPE = "Unknown"
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parses a PostgREST timestamptz string into an aware datetime.
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _intern(value):
+    # Ward ids and types repeat across thousands of reports; share one string each
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Report:
+    """
+    One report with only the fields the aggregation code reads.
+    """
+    __slots__ = ("id", "ward_id", "severity", "type", "lat", "lon", "created_at", "duplicate_of")
+
+    def __init__(self, id, ward_id=None, severity=DEFAULT_SEVERITY, type=DEFAULT_TYPE,
+                 lat=None, lon=None, created_at=None, duplicate_of=None):
+        self.id = id
+        self.ward_id = ward_id
+        self.severity = severity
+        self.type = type
+        self.lat = lat
+        self.lon = lon
+        self.created_at = created_at
+        self.duplicate_of = duplicate_of
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Report":
+        point = parse_point(row.get("location"))
+        severity = row.get("severity")
+        return cls(
+            row.get("id"),
+            ward_id=_intern(row.get("ward_id")),
+            severity=DEFAULT_SEVERITY if severity is None else severity,
+            type=_intern(row.get("type") or DEFAULT_TYPE),
+            lat=point[0] if point else None,
+            lon=point[1] if point else None,
+            created_at=parse_timestamp(row["created_at"]) if row.get("created_at") else None,
+            duplicate_of=row.get("duplicate_of"),
+        )
+
+    def __repr__(self):
+        return f"Report(id={self.id!r}, ward_id={self.ward_id!r}, severity={self.severity}, type={self.type!r})"
+
+
+class ReportColumns:
+    """
+    Reports as parallel arrays. Wards and types are stored as int codes into the
+    `wards` / `types` lists (-1 = no ward); missing coordinates are NaN.
+    """
+
+    def __init__(self, ids: list, ward_codes, wards: list, severity, type_codes, types: list,
+                 lat, lon, descriptions: list = None):
+        self.ids = ids
+        self.ward_codes = ward_codes
+        self.wards = wards
+        self.severity = severity
+        self.type_codes = type_codes
+        self.types = types
+        self.lat = lat
+        self.lon = lon
+        self.descriptions = descriptions
+
+    @classmethod
+    def from_rows(cls, rows: list, descriptions: bool = False) -> "ReportColumns":
+        n = len(rows)
+        ward_lookup, type_lookup = {}, {}
+        ward_codes = np.empty(n, dtype=np.int32)
+        type_codes = np.empty(n, dtype=np.int16)
+        severity = np.empty(n, dtype=np.int8)
+        lat = np.full(n, np.nan)
+        lon = np.full(n, np.nan)
+        for i, row in enumerate(rows):
+            ward_id = row.get("ward_id")
+            ward_codes[i] = ward_lookup.setdefault(ward_id, len(ward_lookup)) if ward_id else -1
+            type_codes[i] = type_lookup.setdefault(row.get("type") or DEFAULT_TYPE, len(type_lookup))
+            value = row.get("severity")
+            severity[i] = DEFAULT_SEVERITY if value is None else value
+            point = parse_point(row.get("location"))
+            if point:
+                lat[i], lon[i] = point
+        return cls(
+            [row.get("id") for row in rows], ward_codes, list(ward_lookup), severity,
+            type_codes, list(type_lookup), lat, lon,
+            [row.get("description") or "" for row in rows] if descriptions else None,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def has_point(self) -> np.ndarray:
+        return ~np.isnan(self.lat)
+
+    def type_name(self, i: int) -> str:
+        return self.types[self.type_codes[i]]
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """
+    Small key -> JSON-serializable value store for half-finished bot conversations.
+
+    - Every entry expires `ttl` seconds after it was last written or read, so LRU
+      order is also expiry order.
+    - At most `max_entries` are kept; the least recently used entry is evicted first.
+    - If `path` is set, entries are reloaded on start and every change is saved to a
+      JSON file by a background thread, so the caller never waits on disk. Changes
+      made while a write is running are coalesced into the next one. Call `close()`
+      on shutdown to write the final state.
+
+    Keys are stored as strings in the file and converted back with `key_type`.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, path: str = None, key_type=int, name: str = "sessions"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.key_type = key_type
+        self.name = name
+        self._entries = OrderedDict()  # key -> (expires_at, value, approx_bytes), LRU first
+        self._bytes = 0
+        self._dirty = False
+        self._lock = threading.Lock()  # Guards _entries against the writer thread
+        self._write_lock = threading.Lock()  # One file write at a time
+        self._wake = threading.Event()
+        self._closing = False
+        self._writer = None
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "flushes": 0, "flush_errors": 0}
+        if path:
+            self._load()
+            self._writer = threading.Thread(target=self._write_loop, name=f"{name}-writer", daemon=True)
+            self._writer.start()
+
+    def put(self, key, value):
+        with self._lock:
+            self._drop(key)
+            now = time.time()
+            # Cheap incremental cleanup: drop expired entries sitting at the LRU end
+            while self._entries:
+                oldest = next(iter(self._entries))
+                if self._entries[oldest][0] > now:
+                    break
+                self._drop(oldest)
+                self.stats["expired"] += 1
+            size = len(json.dumps(value, default=str))
+            self._entries[key] = (now + self.ttl, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.stats["evicted"] += 1
+            self._dirty = True
+        self._changed()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                # Reading keeps the session alive, and keeps LRU order equal to expiry order
+                entry = self._entries[key] = (time.time() + self.ttl, entry[1], entry[2])
+                self._entries.move_to_end(key)
+                self._dirty = True
+        self._changed()
+        return entry[1] if entry is not None else None
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                self._drop(key)
+                self._dirty = True
+        self._changed()
+        return entry[1] if entry is not None else None
+
+    def __contains__(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.time()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def flush(self):
+        """
+        Writes all entries to `path` atomically, in the calling thread (no-op without
+        a path or changes).
+        """
+        if not self.path:
+            return
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                rows = [[str(key), expires_at, value] for key, (expires_at, value, _) in self._entries.items()]
+                self._dirty = False
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(rows, f, default=str)
+                os.replace(tmp_path, self.path)
+                self.stats["flushes"] += 1
+            except OSError as e:
+                self._dirty = True  # Retried on the next change or flush
+                self.stats["flush_errors"] += 1
+                print(f"⚠️ {self.name} flush failed: {e}")
+
+    def close(self):
+        """
+        Stops the background writer and writes the final state.
+        """
+        if self._writer is not None:
+            self._closing = True
+            self._wake.set()
+            self._writer.join()
+            self._writer = None
+        self.flush()
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "approx_bytes": self._bytes,
+            "ttl_seconds": self.ttl,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "persistent": bool(self.path),
+        }
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.time():
+            self._drop(key)
+            self.stats["expired"] += 1
+            self._dirty = True
+            entry = None
+        self.stats["hits" if entry is not None else "misses"] += 1
+        return entry
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _changed(self):
+        if self._writer is not None and self._dirty:
+            self._wake.set()
+
+    def _write_loop(self):
+        while not self._closing:
+            self._wake.wait()
+            self._wake.clear()
+            if not self._closing:
+                self.flush()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {self.name} could not load {self.path}: {e}")
+            return
+
+        now = time.time()
+        for key, expires_at, value in rows:
+            if expires_at > now:
+                size = len(json.dumps(value, default=str))
+                self._entries[self.key_type(key)] = (expires_at, value, size)
+                self._bytes += size
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
@@ -0,0 +1,182 @@
+import json
+import math
+import os
+import struct
+import time
+import numpy as np
+from gazetteer import WARD_CENTROIDS
+
+# Spatial Index Config
+# Points further than WARD_MAX_DISTANCE_KM from every ward centroid are not assigned a
+# ward. WARD_GRID_CELL_DEG (~1.1km) trades build time for candidates checked per lookup.
+WARD_MAX_DISTANCE_KM = float(os.environ.get("WARD_MAX_DISTANCE_KM", 5))
+WARD_GRID_CELL_DEG = float(os.environ.get("WARD_GRID_CELL_DEG", 0.01))
+
+KM_PER_DEG = 111.32
+
+
+def parse_point(value):
+    """
+    Returns (lat, lon) for a PostGIS point as returned by Supabase, or None.
+    Accepts WKT ("POINT(lon lat)", optionally "SRID=4326;"-prefixed), EWKB hex
+    (PostgREST's default geometry encoding) and GeoJSON (dict or string).
+    """
+    if not value:
+        return None
+    try:
+        if isinstance(value, dict):
+            if value.get("type") == "Point":
+                lon, lat = value["coordinates"][:2]
+                return float(lat), float(lon)
+            return None
+
+        text = value.strip()
+        if text.startswith("{"):
+            return parse_point(json.loads(text))
+
+        if ";" in text:
+            text = text.split(";", 1)[1]
+        if text.upper().startswith("POINT"):
+            coords = text[text.index("(") + 1:text.rindex(")")].split()
+            return float(coords[1]), float(coords[0])
+
+        data = bytes.fromhex(text)
+        order = "<" if data[0] == 1 else ">"
+        geom_type = struct.unpack_from(order + "I", data, 1)[0]
+        if geom_type & 0xFF != 1:
+            return None
+        offset = 9 if geom_type & 0x20000000 else 5  # Skip the SRID when present
+        lon, lat = struct.unpack_from(order + "dd", data, offset)
+        return lat, lon
+    except (ValueError, KeyError, IndexError, TypeError, struct.error):
+        return None
+
+
+class WardIndex:
+    """
+    Nearest-centroid ward lookup over a uniform lat/lon grid.
+
+    At build time every grid cell stores the few wards that can be nearest to some
+    point inside it (those within the cell's best distance plus its diagonal), so a
+    lookup is one cell computation and a handful of distance checks. Distances use an
+    equirectangular projection, which is accurate to well under 1% at city scale.
+    """
+
+    def __init__(self, wards: list, max_distance_km: float = WARD_MAX_DISTANCE_KM,
+                 cell_deg: float = WARD_GRID_CELL_DEG):
+        """
+        `wards` is a list of {"id", "name", "lat", "lon"} dicts.
+        """
+        if not wards:
+            raise ValueError("WardIndex needs at least one ward")
+        started = time.perf_counter()
+        self.wards = wards
+        self.max_distance_km = max_distance_km
+        self.cell_deg = cell_deg
+
+        self.lats = np.array([w["lat"] for w in wards], dtype=np.float64)
+        self.lons = np.array([w["lon"] for w in wards], dtype=np.float64)
+        self.lon_scale = math.cos(math.radians(float(self.lats.mean())))
+
+        # Grid covers the centroids padded by the max distance; anything outside has no ward
+        pad_lat = max_distance_km / KM_PER_DEG
+        pad_lon = pad_lat / self.lon_scale
+        self.lat0 = float(self.lats.min()) - pad_lat
+        self.lon0 = float(self.lons.min()) - pad_lon
+        self.rows = int((float(self.lats.max()) + pad_lat - self.lat0) / cell_deg) + 1
+        self.cols = int((float(self.lons.max()) + pad_lon - self.lon0) / cell_deg) + 1
+
+        center_lats = self.lat0 + (np.arange(self.rows) + 0.5) * cell_deg
+        center_lons = self.lon0 + (np.arange(self.cols) + 0.5) * cell_deg
+        grid_lat, grid_lon = np.meshgrid(center_lats, center_lons, indexing="ij")
+        distances = self._distances_km(grid_lat.ravel(), grid_lon.ravel())  # (cells, wards)
+
+        half_diagonal = math.hypot(cell_deg, cell_deg * self.lon_scale) * KM_PER_DEG / 2
+        best = distances.min(axis=1, keepdims=True)
+        mask = distances <= best + 2 * half_diagonal
+        self.cells = [tuple(np.flatnonzero(row)) for row in mask]
+        # Same candidates padded to one (cells, max candidates) array for lookup_many, -1 = none
+        self.candidates = np.full((len(self.cells), max(len(c) for c in self.cells)), -1, dtype=np.int64)
+        for i, cell in enumerate(self.cells):
+            self.candidates[i, :len(cell)] = cell
+        self.build_seconds = time.perf_counter() - started
+        self.lookups = 0
+
+    def _distances_km(self, lats, lons):
+        dlat = lats[:, None] - self.lats[None, :]
+        dlon = (lons[:, None] - self.lons[None, :]) * self.lon_scale
+        return np.sqrt(dlat * dlat + dlon * dlon) * KM_PER_DEG
+
+    def lookup(self, lat: float, lon: float):
+        """
+        Returns the ward dict nearest to the point, or None if it is out of range.
+        """
+        self.lookups += 1
+        row = int((lat - self.lat0) / self.cell_deg)
+        col = int((lon - self.lon0) / self.cell_deg)
+        if not (0 <= row < self.rows and 0 <= col < self.cols) or lat < self.lat0 or lon < self.lon0:
+            return None
+
+        best = None
+        best_distance = self.max_distance_km
+        for i in self.cells[row * self.cols + col]:
+            dlat = lat - self.lats[i]
+            dlon = (lon - self.lons[i]) * self.lon_scale
+            distance = math.sqrt(dlat * dlat + dlon * dlon) * KM_PER_DEG
+            if distance <= best_distance:
+                best, best_distance = i, distance
+        return self.wards[best] if best is not None else None
+
+    def lookup_many(self, lats, lons) -> np.ndarray:
+        """
+        Vectorized `lookup` over the same grid cells. Returns an array of ward positions
+        in `self.wards`, -1 where the point is missing (NaN) or out of range.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        result = np.full(len(lats), -1, dtype=np.int32)
+        self.lookups += len(lats)
+
+        with np.errstate(invalid="ignore"):
+            rows = np.floor((lats - self.lat0) / self.cell_deg)
+            cols = np.floor((lons - self.lon0) / self.cell_deg)
+            inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        points = np.flatnonzero(inside)
+        if not len(points):
+            return result
+
+        candidates = self.candidates[rows[points].astype(np.int64) * self.cols + cols[points].astype(np.int64)]
+        dlat = lats[points, None] - self.lats[candidates]
+        dlon = (lons[points, None] - self.lons[candidates]) * self.lon_scale
+        distances = np.sqrt(dlat * dlat + dlon * dlon) * KM_PER_DEG
+        distances[candidates < 0] = np.inf
+        nearest = distances.argmin(axis=1)
+        picked = np.arange(len(points))
+        in_range = distances[picked, nearest] <= self.max_distance_km
+        result[points] = np.where(in_range, candidates[picked, nearest], -1)
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "wards": len(self.wards),
+            "cells": self.rows * self.cols,
+            "max_candidates_per_cell": max(len(c) for c in self.cells),
+            "build_seconds": round(self.build_seconds, 4),
+            "lookups": self.lookups,
+        }
+
+
+def load_ward_index(client) -> WardIndex:
+    """
+    Builds a WardIndex from the wards table, placing each ward at its gazetteer centroid.
+    Blocking: call it from a thread in async code.
+    """
+    rows = client.table("wards").select("id, name").execute().data
+    wards = []
+    for row in rows:
+        centroid = WARD_CENTROIDS.get(row["name"])
+        if centroid is None:
+            print(f"⚠️ No centroid for ward '{row['name']}', it will not be matched")
+            continue
+        wards.append({"id": row["id"], "name": row["name"], "lat": centroid[0], "lon": centroid[1]})
+    return WardIndex(wards)
@@ -0,0 +1,100 @@
+import unicodedata
+import ahocorasick
+
+# Symptom Vocabulary
+# Canonical symptom -> aliases (English, Hinglish, Hindi/Marathi, common misspellings).
+# Aliases match whole words only, so inflections are listed explicitly.
+SYMPTOM_ALIASES = {
+    "fever": ["fever", "fevers", "feverish", "fevr", "feaver", "febrile", "high temperature",
+              "bukhar", "bukhaar", "taap", "बुखार", "ताप"],
+    "joint pain": ["joint pain", "joint pains", "joint ache", "joints pain", "painful joints",
+                   "jodo me dard", "jodon mein dard", "जोड़ों में दर्द", "जोड़ों का दर्द", "सांधेदुखी"],
+    "chills": ["chills", "shivering", "shivers", "kapkapi", "कंपकंपी", "थंडी वाजणे"],
+    "cough": ["cough", "coughs", "coughing", "cought", "khansi", "khaansi", "खांसी", "खोकला"],
+    "headache": ["headache", "headaches", "headach", "head ache", "head pain", "sir dard", "sar dard",
+                 "सिरदर्द", "सिर दर्द", "डोकेदुखी"],
+    "rash": ["rash", "rashes", "skin rash", "red spots", "chakatte", "चकत्ते", "पुरळ"],
+    "nausea": ["nausea", "nausia", "nauseous", "vomit", "vomits", "vomiting", "ulti", "उल्टी", "मळमळ"],
+}
+
+
+class SymptomMatcher:
+    """
+    All symptom aliases compiled into one Aho-Corasick automaton, so each text is
+    scanned exactly once regardless of how many aliases exist. Hits are kept only on
+    whole-word boundaries, and a symptom counts at most once per text.
+    """
+
+    def __init__(self, aliases: dict = SYMPTOM_ALIASES):
+        self.symptoms = list(aliases)
+        self.automaton = ahocorasick.Automaton()
+        for symptom in self.symptoms:
+            for alias in aliases[symptom]:
+                alias = alias.lower()
+                self.automaton.add_word(alias, (symptom, len(alias)))
+        self.automaton.make_automaton()
+
+    def find(self, text: str) -> set:
+        """
+        Canonical symptoms mentioned in a text.
+        """
+        if not text:
+            return set()
+        text = text.lower()
+        # Pad with spaces so every hit has a neighbour on both sides
+        padded = f" {text} "
+        found = set()
+        for end, (symptom, length) in self.automaton.iter(padded):
+            if not (_is_word_char(padded[end - length]) or _is_word_char(padded[end + 1])):
+                found.add(symptom)
+        return found
+
+
+def _is_word_char(char: str) -> bool:
+    # Devanagari vowel signs and nasal marks are combining marks, not alphanumeric
+    return char.isalnum() or (not char.isascii() and unicodedata.category(char)[0] == "M")
+
+
+class SymptomCounter:
+    """
+    Incremental per-symptom report counts over a stream of reports.
+    """
+
+    def __init__(self, matcher: "SymptomMatcher" = None):
+        self.matcher = matcher or symptom_matcher
+        self.counts = dict.fromkeys(self.matcher.symptoms, 0)
+        self.reports = 0
+
+    def add(self, text: str):
+        for symptom in self.matcher.find(text):
+            self.counts[symptom] += 1
+        self.reports += 1
+
+    def add_reports(self, reports):
+        for report in reports:
+            self.add(report.get("description") or "")
+
+    def full_counts(self) -> dict:
+        """
+        Count for every symptom in vocabulary order, including zeros.
+        """
+        return dict(self.counts)
+
+    def top(self, n: int = 3) -> list:
+        """
+        The n most reported symptoms (ties keep vocabulary order), skipping zeros.
+        """
+        ranked = sorted(self.full_counts().items(), key=lambda x: x[1], reverse=True)[:n]
+        return [symptom for symptom, count in ranked if count > 0]
+
+
+symptom_matcher = SymptomMatcher()
+
+
+def count_symptoms(reports, matcher: "SymptomMatcher" = None) -> dict:
+    """
+    Full per-symptom counts (reports mentioning each symptom) for a list of reports.
+    """
+    counter = SymptomCounter(matcher)
+    counter.add_reports(reports)
+    return counter.full_counts()
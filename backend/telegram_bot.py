@@ -2,12 +2,20 @@ import os
 import asyncio
 import json
 import logging
-import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler, filters
 from supabase import create_client, Client
 import google.generativeai as genai
+from llm_cache import cached_llm_call_async
+from metrics import StageTimer
+from images import pick_photo_size, prepare_image
+from phash import PerceptualIndex, dhash
+from session_store import SessionStore
+from spatial_index import load_ward_index
 
 # 1. Setup
 load_dotenv()
@@ -27,8 +35,72 @@ genai.configure(api_key=GEMINI_KEY)
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 model = genai.GenerativeModel('gemini-2.5-flash')
 
-# In-Memory State
-pending_reports = {}
+# Concurrency Config
+# Updates from different chats are handled concurrently; blocking work (image
+# downscaling, Supabase) runs on a bounded thread pool so it never stalls the event loop.
+BOT_CONCURRENT_UPDATES = int(os.getenv("BOT_CONCURRENT_UPDATES", 64))
+BOT_WORKER_THREADS = int(os.getenv("BOT_WORKER_THREADS", 8))
+
+# Admin Config
+# /stats exposes internal latency and queue metrics, so it only answers chats listed in
+# BOT_ADMIN_CHAT_IDS (comma-separated). Unset = nobody.
+BOT_ADMIN_CHAT_IDS = {int(c) for c in os.getenv("BOT_ADMIN_CHAT_IDS", "").split(",") if c.strip()}
+
+blocking_pool = ThreadPoolExecutor(max_workers=BOT_WORKER_THREADS, thread_name_prefix="bot-io")
+stage_timer = StageTimer()  # Per-stage latency histograms, see /stats
+image_stats = {"images": 0, "bytes_downloaded": 0, "bytes_sent": 0}
+photo_index = PerceptualIndex()  # Recently analyzed photos, to catch forwarded copies
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking call on the bot's thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_pool, partial(func, *args, **kwargs))
+
+# Ward Resolution
+# Wards are matched locally against an in-process index; the match_ward RPC is only
+# used while the index cannot be loaded. Failed loads are retried with exponential
+# backoff (WARD_INDEX_RETRY_SECONDS doubling up to WARD_INDEX_RETRY_MAX_SECONDS)
+# rather than on every update.
+WARD_INDEX_RETRY_SECONDS = float(os.getenv("WARD_INDEX_RETRY_SECONDS", 60))
+WARD_INDEX_RETRY_MAX_SECONDS = float(os.getenv("WARD_INDEX_RETRY_MAX_SECONDS", 1800))
+
+ward_index = None
+ward_index_lock = asyncio.Lock()
+ward_index_retry = {"at": 0.0, "delay": WARD_INDEX_RETRY_SECONDS}
+
+async def get_ward_index():
+    global ward_index
+    if ward_index is None and time.monotonic() >= ward_index_retry["at"]:
+        async with ward_index_lock:
+            if ward_index is None and time.monotonic() >= ward_index_retry["at"]:
+                try:
+                    ward_index = await run_blocking(load_ward_index, supabase)
+                except Exception as e:
+                    delay = ward_index_retry["delay"]
+                    ward_index_retry["at"] = time.monotonic() + delay
+                    ward_index_retry["delay"] = min(delay * 2, WARD_INDEX_RETRY_MAX_SECONDS)
+                    logger.warning(f"Ward index unavailable, using match_ward RPC (retry in {delay:.0f}s): {e}")
+    return ward_index
+
+async def generate_text(prompt) -> str:
+    response = await model.generate_content_async(prompt)
+    return response.text
+
+# Pending Report Config
+# Analyses waiting for the user to share a location. Abandoned ones expire, the store is
+# capped with LRU eviction, and PENDING_REPORTS_PATH (optional) keeps them across restarts.
+PENDING_REPORTS_TTL = float(os.getenv("PENDING_REPORTS_TTL", 1800))
+PENDING_REPORTS_MAX = int(os.getenv("PENDING_REPORTS_MAX", 10000))
+PENDING_REPORTS_PATH = os.getenv("PENDING_REPORTS_PATH") or None
+
+pending_reports = SessionStore(
+    ttl=PENDING_REPORTS_TTL,
+    max_entries=PENDING_REPORTS_MAX,
+    path=PENDING_REPORTS_PATH,
+    name="pending_reports"
+)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(
@@ -37,30 +109,72 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode='Markdown'
     )
 
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Replies with per-stage latency percentiles. Admin chats only (BOT_ADMIN_CHAT_IDS).
+    """
+    lines = ["⏱️ Stage latency (p50 / p95 / max, seconds)"]
+    for stage, snap in stage_timer.snapshot().items():
+        lines.append(f"{stage}: {snap['p50_seconds']} / {snap['p95_seconds']} / {snap['max_seconds']} (n={snap['count']})")
+    if image_stats["images"]:
+        saved = image_stats["bytes_downloaded"] - image_stats["bytes_sent"]
+        lines.append(
+            f"🖼️ {image_stats['images']} images, avg upload {image_stats['bytes_sent'] // image_stats['images'] // 1024} KB, "
+            f"{saved // 1024} KB saved by downscaling"
+        )
+    pending = pending_reports.snapshot()
+    lines.append(
+        f"🗂️ {pending['entries']}/{pending['max_entries']} pending reports (~{pending['approx_bytes'] // 1024} KB), "
+        f"{pending['expired']} expired, {pending['evicted']} evicted"
+    )
+    dedup = photo_index.snapshot()
+    lines.append(f"♻️ {dedup['duplicates']}/{dedup['lookups']} photos were near-duplicates ({dedup['entries']} indexed)")
+    await update.message.reply_text("\n".join(lines))
+
 async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     status_msg = await update.message.reply_text("👀 Sentinel Eye is analyzing...")
 
     try:
-        photo_file = await update.message.photo[-1].get_file()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp:
-            await photo_file.download_to_drive(temp.name)
-            temp_path = temp.name
-
-        file_upload = genai.upload_file(temp_path)
-        prompt = """
-        Analyze this image for civic risks (Garbage, Stagnant Water).
-        Return STRICT JSON: {"risk_detected": bool, "severity": int, "type": "str", "description": "str"}
-        """
-        response = model.generate_content([prompt, file_upload])
-        os.unlink(temp_path)
-        
-        # Clean JSON
-        text = response.text.replace('```json', '').replace('```', '').strip()
-        analysis = json.loads(text)
+        with stage_timer.time("end_to_end"):
+            # Everything stays in memory: download, downscale, send inline to Gemini
+            with stage_timer.time("download"):
+                photo_file = await pick_photo_size(update.message.photo).get_file()
+                raw = bytes(await photo_file.download_as_bytearray())
+
+            with stage_timer.time("phash"):
+                photo_hash = await run_blocking(dhash, raw)
+            match = photo_index.find(photo_hash)
+            index_key = photo_hash
+
+            if match is not None:
+                # Forwarded copy of a recent photo: reuse its analysis, link to its report
+                index_key, original = match
+                analysis = {**original["analysis"], "is_duplicate": True, "duplicate_of": original["report_id"]}
+            else:
+                with stage_timer.time("downscale"):
+                    image_bytes = await run_blocking(prepare_image, raw)
+                image_stats["images"] += 1
+                image_stats["bytes_downloaded"] += len(raw)
+                image_stats["bytes_sent"] += len(image_bytes)
+
+                prompt = """
+                Analyze this image for civic risks (Garbage, Stagnant Water).
+                Return STRICT JSON: {"risk_detected": bool, "severity": int, "type": "str", "description": "str"}
+                """
+                with stage_timer.time("vision"):
+                    response = await model.generate_content_async(
+                        [prompt, {"mime_type": "image/jpeg", "data": image_bytes}]
+                    )
+
+                # Clean JSON
+                text = response.text.replace('```json', '').replace('```', '').strip()
+                analysis = json.loads(text)
+                photo_index.add(photo_hash, analysis)
 
         if analysis.get('risk_detected'):
-            pending_reports[user_id] = analysis
+            # Keyed by the indexed hash (not this photo's own) so the report can be linked later
+            pending_reports.put(user_id, {**analysis, "phash": index_key})
             
             # Send Location Button
             btn = KeyboardButton("📍 Share Location", request_location=True)
@@ -93,11 +207,11 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id 
     
-    if user_id not in pending_reports:
+    data = pending_reports.pop(user_id)
+    if data is None:
         await update.message.reply_text("⚠️ Session expired. Please resend photo.")
         return
 
-    data = pending_reports.pop(user_id)
     lat = update.message.location.latitude
     lon = update.message.location.longitude
     
@@ -105,9 +219,15 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         # 1. Match Ward
-        rpc = supabase.rpc('match_ward', {'lat': lat, 'long': lon}).execute()
-        ward_id = rpc.data[0]['id'] if rpc.data else None
-        ward_name = rpc.data[0]['name'] if rpc.data else "Unknown"
+        with stage_timer.time("match_ward"):
+            index = await get_ward_index()
+            if index is not None:
+                ward = index.lookup(lat, lon)
+            else:
+                rpc = await run_blocking(supabase.rpc('match_ward', {'lat': lat, 'long': lon}).execute)
+                ward = rpc.data[0] if rpc.data else None
+        ward_id = ward['id'] if ward else None
+        ward_name = ward['name'] if ward else "Unknown"
 
         # 2. Insert Report (WITH CHAT_ID)
         payload = {
@@ -118,7 +238,17 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "location": f"POINT({lon} {lat})",
             "chat_id": chat_id 
         }
-        supabase.table('reports').insert(payload).execute()
+        duplicate_of = data.get('duplicate_of')
+        if data.get('is_duplicate') and not duplicate_of:
+            # The original may have been filed while this user was sharing their location
+            duplicate_of = photo_index.report_id(data['phash'])
+        if duplicate_of:
+            # Linked to the original report so the brain does not count it twice
+            payload["duplicate_of"] = duplicate_of
+        with stage_timer.time("insert_report"):
+            inserted = await run_blocking(supabase.table('reports').insert(payload).execute)
+        if inserted.data and not duplicate_of:
+            photo_index.link(data['phash'], inserted.data[0]['id'])
         
         # 3. Generate Personal Precaution
         advice_prompt = f"""
@@ -126,8 +256,12 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
         Give 3 short, bullet-point personal health precautions they should take IMMEDIATELY.
         Do not use markdown formatting (no bold, no italics). Just plain text with emoji bullets.
         """
-        advice_res = model.generate_content(advice_prompt)
-        advice_text = advice_res.text
+        # Same report type + severity always gets the same advice, so reuse it across users
+        with stage_timer.time("advice"):
+            advice_text = await cached_llm_call_async(
+                "telegram_advice", model.model_name, advice_prompt,
+                lambda: generate_text(advice_prompt)
+            )
 
         final_msg = (
             f"✅ *Report Filed for {ward_name}*\n\n"
@@ -153,8 +287,19 @@ if __name__ == '__main__':
         print("Error: TELEGRAM_BOT_TOKEN not found.")
         exit(1)
         
-    app = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    async def save_pending_reports(application):
+        await run_blocking(pending_reports.close)
+
+    app = (
+        ApplicationBuilder()
+        .token(TELEGRAM_TOKEN)
+        .concurrent_updates(BOT_CONCURRENT_UPDATES)
+        .post_shutdown(save_pending_reports)
+        .build()
+    )
     app.add_handler(CommandHandler("start", start))
+    # Other chats' /stats never reaches the handler
+    app.add_handler(CommandHandler("stats", stats, filters=filters.Chat(chat_id=BOT_ADMIN_CHAT_IDS)))
     app.add_handler(MessageHandler(filters.PHOTO, handle_photo))
     app.add_handler(MessageHandler(filters.LOCATION, handle_location))
     
@@ -3,7 +3,15 @@ import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from pathlib import Path
+from datetime import datetime
+import asyncio
 import math
+import numpy as np
+from cache import AsyncTTLCache
+from db import PAGE_SIZE, iter_pages, run_query
+from gazetteer import location_keys_for
+from disease_rules import disease_rules
+from symptoms import SymptomCounter
 
 # Load .env from the same directory as this file
 env_path = Path(__file__).parent / '.env'
@@ -14,39 +22,153 @@ url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
 supabase: Client = create_client(url, key)
 
+# Shared HTTP Client Config (Open-Meteo and other upstreams)
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 10))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", 50))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", 30))
+
+_http_client: httpx.AsyncClient = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared keep-alive client used for all upstream HTTP calls.
+    FastAPI creates it on startup; scripts (agents.py, verify.py) get one lazily.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+    return _http_client
+
+async def close_http_client():
+    """
+    Closes the shared HTTP client (called on FastAPI shutdown).
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# Weather Cache Config
+# Open-Meteo refreshes "current" values every 15 minutes, so a few minutes of TTL is safe.
+# Coordinates are rounded to WEATHER_CACHE_PRECISION decimals (2 = ~1.1km) to build the key.
+WEATHER_CACHE_TTL = float(os.environ.get("WEATHER_CACHE_TTL", 600))
+WEATHER_CACHE_PRECISION = int(os.environ.get("WEATHER_CACHE_PRECISION", 2))
+WEATHER_BULK_CHUNK = int(os.environ.get("WEATHER_BULK_CHUNK", 100))  # Points per multi-location request
+
+def _weather_key(latitude: float, longitude: float) -> tuple:
+    return (round(latitude, WEATHER_CACHE_PRECISION), round(longitude, WEATHER_CACHE_PRECISION))
+
 async def get_weather_data(latitude: float, longitude: float):
     """
-    Fetches current weather and AQI from Open-Meteo.
+    Returns current weather and AQI for a location, served from the weather cache.
+    Concurrent misses for the same rounded coordinates share one upstream fetch,
+    and expired entries are refreshed in the background while the old value is served.
+    """
+    return await weather_cache.get(_weather_key(latitude, longitude))
+
+async def get_weather_data_bulk(coords: list, fresh: bool = False) -> list:
+    """
+    Returns current weather and AQI for many (latitude, longitude) points, in input order.
+    Cached points are served from memory; all missing points are fetched together
+    in one weather call and one AQI call per WEATHER_BULK_CHUNK points.
+    With `fresh`, every point is fetched upstream (and the cache updated).
+    """
+    keys = [_weather_key(lat, lon) for lat, lon in coords]
+    if fresh:
+        values = await weather_cache.reload_many(keys)
+    else:
+        values = await weather_cache.get_many(keys)
+    return [values[k] for k in keys]
+
+async def _fetch_weather_data(key: tuple):
+    """
+    Fetches current weather and AQI from Open-Meteo for a single point.
+    """
+    data = await _fetch_weather_data_bulk([key])
+    return data[key]
+
+async def _fetch_weather_data_bulk(keys: list) -> dict:
+    """
+    Fetches current weather and AQI from Open-Meteo for many points.
+    Open-Meteo accepts comma-separated coordinate lists, so each chunk costs
+    two upstream calls no matter how many points it holds.
     """
+    chunks = [keys[i:i + WEATHER_BULK_CHUNK] for i in range(0, len(keys), WEATHER_BULK_CHUNK)]
+    results = await asyncio.gather(*[_fetch_weather_chunk(chunk) for chunk in chunks])
+    
+    data = {}
+    for chunk_data in results:
+        data.update(chunk_data)
+    return data
+
+async def _fetch_weather_chunk(keys: list) -> dict:
+    latitudes = ",".join(str(k[0]) for k in keys)
+    longitudes = ",".join(str(k[1]) for k in keys)
+    
     weather_url = "https://api.open-meteo.com/v1/forecast"
     weather_params = {
-        "latitude": latitude,
-        "longitude": longitude,
+        "latitude": latitudes,
+        "longitude": longitudes,
         "current": ["temperature_2m", "relative_humidity_2m", "rain", "precipitation"],
         "forecast_days": 1
     }
     
     aqi_url = "https://air-quality-api.open-meteo.com/v1/air-quality"
     aqi_params = {
-        "latitude": latitude,
-        "longitude": longitude,
+        "latitude": latitudes,
+        "longitude": longitudes,
         "current": ["us_aqi", "pm2_5"]
     }
     
-    async with httpx.AsyncClient() as client:
-        weather_response = await client.get(weather_url, params=weather_params)
-        aqi_response = await client.get(aqi_url, params=aqi_params)
-        
-        data = weather_response.json()
-        aqi_data = aqi_response.json()
+    # Weather and AQI are independent, so fire both at once over the shared pool
+    client = get_http_client()
+    weather_response, aqi_response = await asyncio.gather(
+        client.get(weather_url, params=weather_params),
+        client.get(aqi_url, params=aqi_params)
+    )
+    # Don't let upstream error payloads into the cache; a failed chunk is retried on the
+    # next lookup while stale entries keep being served
+    weather_response.raise_for_status()
+    aqi_response.raise_for_status()
+    
+    weather_points = weather_response.json()
+    aqi_points = aqi_response.json()
+    
+    # A single point comes back as an object, several points as a list
+    if isinstance(weather_points, dict):
+        weather_points = [weather_points]
+    if isinstance(aqi_points, dict):
+        aqi_points = [aqi_points]
+    
+    data = {}
+    for i, key in enumerate(keys):
+        point = weather_points[i]
+        aqi_data = aqi_points[i] if i < len(aqi_points) else {}
         
         # Merge AQI into data
-        if "current" in data and "current" in aqi_data:
-            data["current"]["us_aqi"] = aqi_data["current"].get("us_aqi", 0)
-            data["current"]["pm2_5"] = aqi_data["current"].get("pm2_5", 0.0)
+        if "current" in point and "current" in aqi_data:
+            point["current"]["us_aqi"] = aqi_data["current"].get("us_aqi", 0)
+            point["current"]["pm2_5"] = aqi_data["current"].get("pm2_5", 0.0)
+        data[key] = point
             
     return data
 
+weather_cache = AsyncTTLCache(
+    _fetch_weather_data,
+    ttl=WEATHER_CACHE_TTL,
+    name="weather_cache",
+    bulk_loader=_fetch_weather_data_bulk
+)
+
 def calculate_risk_score(weather_data: dict, report_count: int, verified_count: int = 0) -> float:
     """
     Deterministic formula to calculate risk score (0-10).
@@ -93,77 +215,67 @@ def calculate_risk_score(weather_data: dict, report_count: int, verified_count:
     
     return min(score, 10.0)
 
+# Risk status buckets used by the dashboard and BMC views: (min score, status), highest first
+RISK_STATUS_THRESHOLDS = [(8.0, "CRITICAL"), (6.0, "HIGH"), (4.0, "CAUTION")]
+
+def weather_columns(weather_list: list):
+    """
+    Extracts (rain, humidity) arrays from get_weather_data results, with the same
+    defaults as calculate_risk_score. Missing (None) readings become NaN, which
+    scores as no weather risk.
+    """
+    currents = [w.get("current", {}) for w in weather_list]
+    rain = np.array([c.get("rain", 0.0) for c in currents], dtype=np.float64)
+    humidity = np.array([c.get("relative_humidity_2m", 0) for c in currents], dtype=np.float64)
+    return rain, humidity
+
+def calculate_risk_scores(rain, humidity, report_counts, verified_counts=None) -> np.ndarray:
+    """
+    Vectorized calculate_risk_score over column arrays, one score per cell.
+    Applies the same terms in the same order, so every score is bit-for-bit equal
+    to the scalar function's (see benchmark_risk_score.py).
+    """
+    rain = np.asarray(rain, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    report_counts = np.asarray(report_counts, dtype=np.float64)
+    verified_counts = np.zeros_like(report_counts) if verified_counts is None else np.asarray(verified_counts, dtype=np.float64)
+
+    score = np.zeros(rain.shape, dtype=np.float64)
+    score += np.select([rain > 10.0, rain > 5.0, rain > 0.0], [2.0, 3.0, 1.0], 0.0)
+    score += np.select([humidity > 80, humidity > 60], [2.0, 1.0], 0.0)
+    score += np.minimum(report_counts * 0.5, 4.0)
+    score += np.minimum(verified_counts * 1.0, 5.0)
+    score += 1.0
+    return np.minimum(score, 10.0)
+
+def risk_statuses(scores) -> np.ndarray:
+    """
+    Maps scores to CRITICAL / HIGH / CAUTION / SAFE using RISK_STATUS_THRESHOLDS.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.select(
+        [scores >= threshold for threshold, _ in RISK_STATUS_THRESHOLDS],
+        [status for _, status in RISK_STATUS_THRESHOLDS],
+        "SAFE"
+    )
+
 def predict_disease_risk(weather_data: dict, symptoms: list) -> list:
     """
     Predicts potential diseases based on weather patterns and reported symptoms.
+    Rules live in disease_rules.py; disease_rules.predict_many scores many wards at once.
     """
-    risks = []
-    current = weather_data.get("current", {})
-    rain = current.get("rain", 0.0)
-    humidity = current.get("relative_humidity_2m", 0)
-    
-    # Symptom Keywords
-    symptom_text = " ".join(symptoms).lower()
-    
-    # 1. Dengue Risk
-    # High humidity + Rain + High Fever/Joint Pain
-    dengue_score = 0
-    if humidity > 70: dengue_score += 1
-    if rain > 5: dengue_score += 1
-    if "fever" in symptom_text: dengue_score += 1
-    if "joint" in symptom_text or "bone" in symptom_text: dengue_score += 2
-    
-    if dengue_score >= 3:
-        risks.append({"disease": "Dengue", "probability": "High", "vector": "Aedes Mosquito"})
-    elif dengue_score >= 1:
-        risks.append({"disease": "Dengue", "probability": "Moderate", "vector": "Aedes Mosquito"})
-
-    # 2. Malaria Risk
-    # Stagnant water (Rain) + Chills/Sweating
-    malaria_score = 0
-    if rain > 10: malaria_score += 2
-    if "chills" in symptom_text: malaria_score += 2
-    if "sweat" in symptom_text: malaria_score += 1
-    
-    if malaria_score >= 3:
-        risks.append({"disease": "Malaria", "probability": "High", "vector": "Anopheles Mosquito"})
-        
-    # 3. Leptospirosis Risk
-    # Heavy Rain (Flooding) + Muscle Pain
-    lepto_score = 0
-    if rain > 20: lepto_score += 3
-    if "muscle" in symptom_text or "calf" in symptom_text: lepto_score += 2
-    
-    if lepto_score >= 3:
-        risks.append({"disease": "Leptospirosis", "probability": "High", "vector": "Contaminated Water"})
-
-    return risks
+    return [dict(risk) for risk in disease_rules.predict_many([weather_data], [symptoms])[0]]
 
-def analyze_symptoms(reports: list) -> dict:
+def analyze_symptoms(reports: list) -> list:
     """
     Extracts and counts symptoms from a list of report descriptions.
+    Returns the top 3 trending; see symptoms.count_symptoms for full counts.
     """
-    symptoms = {
-        "fever": 0,
-        "joint pain": 0,
-        "chills": 0,
-        "cough": 0,
-        "headache": 0,
-        "rash": 0,
-        "nausea": 0
-    }
-    
-    for report in reports:
-        text = report.get("description", "").lower()
-        for symptom in symptoms:
-            if symptom in text:
-                symptoms[symptom] += 1
-                
-    # Return top 3 trending
-    sorted_symptoms = sorted(symptoms.items(), key=lambda x: x[1], reverse=True)[:3]
-    return [s[0] for s in sorted_symptoms if s[1] > 0]
-
-def create_dispatch_ticket(location: str, risk_score: float, reasoning: str):
+    counter = SymptomCounter()
+    counter.add_reports(reports)
+    return counter.top(3)
+
+async def create_dispatch_ticket(location: str, risk_score: float, reasoning: str):
     """
     Creates a dispatch ticket in Supabase. This acts as the 'Pause' mechanism.
     """
@@ -173,22 +285,136 @@ def create_dispatch_ticket(location: str, risk_score: float, reasoning: str):
         "reasoning": reasoning,
         "status": "pending"
     }
-    response = supabase.table("dispatch_tickets").insert(data).execute()
+    response = await run_query(supabase.table("dispatch_tickets").insert(data), "dispatch_tickets.insert")
     return response.data
 
-    return response.data
+# Location Key Config
+# Rows written before add_location_keys.sql have no location_key until
+# backfill_location_keys.py has run; until then they are still matched by text.
+# Set LOCATION_KEYS_BACKFILLED=1 once the backfill is confirmed done.
+LOCATION_KEYS_BACKFILLED = os.environ.get("LOCATION_KEYS_BACKFILLED", "0") == "1"
+
+def _quote_filter_value(value: str) -> str:
+    # Double-quoted so commas and parentheses in user text do not break an or= filter
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _location_filter(query, location: str):
+    keys = location_keys_for(location)
+    if not keys:
+        # Places outside the gazetteer (e.g. "Mumbai") have no key, fall back to a text match
+        return query.ilike("location", f"%{location}%")
+    if LOCATION_KEYS_BACKFILLED:
+        # Indexed equality on the canonical key set at write time
+        return query.in_("location_key", keys)
+    pattern = _quote_filter_value(f"*{location}*")
+    return query.or_(f"location_key.in.({','.join(keys)}),and(location_key.is.null,location.ilike.{pattern})")
+
+def _with_page_keys(columns: str) -> str:
+    # Keyset paging resumes from the last row's (created_at, id)
+    if "*" in columns:
+        return columns
+    present = {c.strip() for c in columns.split(",")}
+    return ", ".join([columns, *[c for c in ("created_at", "id") if c not in present]])
 
-def get_citizen_reports(location: str, verified_only: bool = False):
+async def iter_citizen_reports(columns: str = "*", location: str = None, location_keys: list = None,
+                               unkeyed_only: bool = False, verified_only: bool = False, since=None, until=None,
+                               page_size: int = PAGE_SIZE, name: str = "citizen_reports.page"):
     """
-    Fetches recent citizen reports for a location.
+    Streams citizen reports page by page in created_at order (see db.iter_pages).
+    Filters: a location (as get_citizen_reports), explicit location_keys, rows without a
+    location_key, verified only, and a created_at window [since, until) given as
+    datetimes or ISO strings.
     """
-    query = supabase.table("citizen_reports").select("*").ilike("location", f"%{location}%")
-    
-    if verified_only:
-        query = query.eq("verified", True)
-        
-    response = query.execute()
-    return response.data
+    columns = _with_page_keys(columns)
+
+    def build_query():
+        query = supabase.table("citizen_reports").select(columns)
+        if location:
+            query = _location_filter(query, location)
+        if location_keys is not None:
+            query = query.in_("location_key", location_keys)
+        if unkeyed_only:
+            query = query.is_("location_key", "null")
+        if verified_only:
+            query = query.eq("verified", True)
+        if since:
+            query = query.gte("created_at", since.isoformat() if isinstance(since, datetime) else since)
+        if until:
+            query = query.lt("created_at", until.isoformat() if isinstance(until, datetime) else until)
+        return query
+
+    async for page in iter_pages(build_query, name, page_size):
+        yield page
+
+async def get_citizen_reports(location: str, verified_only: bool = False, columns: str = "*"):
+    """
+    Fetches recent citizen reports for a location. Pass `columns` to fetch only the fields you read.
+    Prefer iter_citizen_reports when the result can be processed page by page.
+    """
+    return [
+        report
+        async for page in iter_citizen_reports(columns, location=location, verified_only=verified_only,
+                                               name="citizen_reports.by_location")
+        for report in page
+    ]
+
+async def summarize_citizen_reports(location: str = None, since=None) -> dict:
+    """
+    Report count, verified count and symptom counts for a location (or all reports),
+    computed page by page without holding the reports in memory.
+    """
+    summary = {"reports": 0, "verified": 0, "symptoms": SymptomCounter()}
+    async for page in iter_citizen_reports("description, verified", location=location, since=since,
+                                           name="citizen_reports.summary"):
+        summary["reports"] += len(page)
+        summary["verified"] += sum(1 for report in page if report.get("verified"))
+        summary["symptoms"].add_reports(page)
+    return summary
+
+async def count_citizen_reports_by_ward(ward_names: list) -> dict:
+    """
+    {ward name: {"reports": n, "verified": n, "symptoms": SymptomCounter}} for many wards
+    (the same shape as summarize_citizen_reports), streamed page by page.
+    One paged scan for all wards the gazetteer knows. Unlike get_citizen_reports(name),
+    parent areas are left out: a report filed as just "Andheri" belongs to neither
+    Andheri East nor Andheri West here, so it is not counted twice.
+    """
+    wards_by_key = {}
+    counts = {}
+    for name in ward_names:
+        counts[name] = {"reports": 0, "verified": 0, "symptoms": SymptomCounter()}
+        for key in location_keys_for(name, include_parent=False):
+            wards_by_key.setdefault(key, []).append(name)
+
+    def count(name, report):
+        summary = counts[name]
+        summary["reports"] += 1
+        summary["verified"] += bool(report.get("verified"))
+        summary["symptoms"].add(report.get("description") or "")
+
+    if wards_by_key:
+        async for page in iter_citizen_reports("description, verified, location_key", location_keys=list(wards_by_key),
+                                               name="citizen_reports.by_wards"):
+            for report in page:
+                for name in wards_by_key.get(report.get("location_key"), ()):
+                    count(name, report)
+
+    if wards_by_key and not LOCATION_KEYS_BACKFILLED:
+        # Rows not backfilled yet: the old ilike '%ward%' match, done on the unkeyed rows only
+        keyed_wards = [(name, name.lower()) for name in counts if location_keys_for(name)]
+        async for page in iter_citizen_reports("description, verified, location", unkeyed_only=True,
+                                               name="citizen_reports.by_wards_unkeyed"):
+            for report in page:
+                location = (report.get("location") or "").lower()
+                for name, needle in keyed_wards:
+                    if needle in location:
+                        count(name, report)
+
+    # Ward names the gazetteer does not know fall back to the per-location text match
+    for name in counts:
+        if not location_keys_for(name):
+            counts[name] = await summarize_citizen_reports(name)
+    return counts
 
 from duckduckgo_search import DDGS
 
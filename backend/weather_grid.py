@@ -0,0 +1,132 @@
+import asyncio
+import os
+import time
+import numpy as np
+from tools import get_weather_data_bulk
+
+# Grid Config
+# 10 x 5 points over Mumbai is ~4km x ~4km spacing and fits in one bulk Open-Meteo call.
+WEATHER_GRID_ROWS = int(os.environ.get("WEATHER_GRID_ROWS", 10))
+WEATHER_GRID_COLS = int(os.environ.get("WEATHER_GRID_COLS", 5))
+WEATHER_GRID_REFRESH = float(os.environ.get("WEATHER_GRID_REFRESH", 600))
+
+# Fields kept per lattice point, in array order
+GRID_FIELDS = ["temperature_2m", "relative_humidity_2m", "rain", "precipitation", "us_aqi", "pm2_5"]
+
+
+class WeatherGrid:
+    """
+    Current weather and AQI on a fixed lat/lon lattice, refreshed in the background.
+
+    The lattice lives in one float32 array of shape (fields, rows, cols), so point
+    queries are answered by bilinear interpolation without touching the network.
+    Readings upstream did not return are NaN and left out of the interpolation; a
+    field missing at all four surrounding points is missing from the sample too.
+    """
+
+    def __init__(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                 rows: int = WEATHER_GRID_ROWS, cols: int = WEATHER_GRID_COLS):
+        self.lats = np.linspace(lat_min, lat_max, rows)
+        self.lons = np.linspace(lon_min, lon_max, cols)
+        self.rows = rows
+        self.cols = cols
+        self.values = None  # Swapped in whole on refresh, never mutated in place
+        self.updated_at = None
+        self.refreshes = 0
+        self.errors = 0
+
+    @classmethod
+    def around(cls, points: list, padding: float = 0.02, **kwargs):
+        """
+        Builds a grid covering the bounding box of (lat, lon) points plus padding degrees.
+        """
+        lats = [p[0] for p in points]
+        lons = [p[1] for p in points]
+        return cls(min(lats) - padding, max(lats) + padding, min(lons) - padding, max(lons) + padding, **kwargs)
+
+    def lattice_points(self) -> list:
+        return [(float(lat), float(lon)) for lat in self.lats for lon in self.lons]
+
+    async def refresh(self):
+        """
+        Fetches every lattice point upstream in one batch. The fetch bypasses cached
+        values (which would be up to one TTL old already) and refreshes them instead.
+        """
+        weather = await get_weather_data_bulk(self.lattice_points(), fresh=True)
+
+        values = np.full((len(GRID_FIELDS), self.rows, self.cols), np.nan, dtype=np.float32)
+        for i, point in enumerate(weather):
+            row, col = divmod(i, self.cols)
+            current = point.get("current", {})
+            for f, field in enumerate(GRID_FIELDS):
+                value = current.get(field)
+                if value is not None:
+                    values[f, row, col] = value
+
+        self.values = values
+        self.updated_at = time.time()
+        self.refreshes += 1
+
+    async def run(self, interval: float = WEATHER_GRID_REFRESH):
+        """
+        Background job: keeps the grid warm until cancelled.
+        """
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Weather Grid refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    def sample(self, latitude: float, longitude: float):
+        """
+        Returns weather for a point in the same shape as get_weather_data,
+        or None if the grid is not warmed yet or the point is outside it.
+        """
+        values = self.values
+        if values is None:
+            return None
+
+        lat0, lat1 = self.lats[0], self.lats[-1]
+        lon0, lon1 = self.lons[0], self.lons[-1]
+        if not (lat0 <= latitude <= lat1 and lon0 <= longitude <= lon1):
+            return None
+
+        # Fractional lattice coordinates of the point
+        y = (latitude - lat0) / (lat1 - lat0) * (self.rows - 1)
+        x = (longitude - lon0) / (lon1 - lon0) * (self.cols - 1)
+        r = min(int(y), self.rows - 2)
+        c = min(int(x), self.cols - 2)
+        ty = y - r
+        tx = x - c
+
+        # Bilinear weights of the four corners, renormalized over the corners that have a reading
+        corners = values[:, r:r + 2, c:c + 2].reshape(len(GRID_FIELDS), 4)
+        weights = np.array([(1 - ty) * (1 - tx), (1 - ty) * tx, ty * (1 - tx), ty * tx])
+        present = ~np.isnan(corners)
+        total = (present * weights).sum(axis=1)
+        mixed = np.where(present, corners, 0.0) @ weights / np.where(total > 0, total, 1.0)
+
+        current = {
+            field: round(float(v), 2)
+            for field, v, weight in zip(GRID_FIELDS, mixed, total) if weight > 0
+        }
+        if "us_aqi" in current:
+            current["us_aqi"] = int(round(current["us_aqi"]))
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": current,
+            "grid_updated_at": self.updated_at
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "bytes": int(self.values.nbytes) if self.values is not None else 0,
+            "age_seconds": round(time.time() - self.updated_at, 1) if self.updated_at else None,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+        }